@@ -1,6 +1,6 @@
-
 import os
 import sys
+from collections import Counter
 from src.models import FolderWeight
 from src.processors.matcher import Matcher
 
@@ -16,19 +16,16 @@ def diagnose():
         FolderWeight(folder="nature", weight=50)
     ]
     
-    print("Testing weighted_route 100 times...")
-    counts = {"minecraft": 0, "nature": 0}
-    
-    for _ in range(100):
-        path = matcher.weighted_route(folder_weights)
-        if "minecraft" in path:
-            counts["minecraft"] += 1
-        elif "nature" in path:
-            counts["nature"] += 1
-        else:
-            print(f"Unexpected path: {path}")
-            
-    print(f"Results: {counts}")
+    # Empirical split of real weighted_route picks against the configured shares
+    n_picks = 1000
+    print(f"Testing weighted_route {n_picks} times...")
+    counts = Counter(os.path.basename(matcher.weighted_route(folder_weights) or "") for _ in range(n_picks))
+    total_weight = sum(fw.weight for fw in folder_weights)
+    for fw in folder_weights:
+        expected = fw.weight / total_weight if total_weight else 0.0
+        print(f"  {fw.folder}: {counts.pop(fw.folder, 0)} picks ({expected:.0%} expected)")
+    for name, n in counts.items():
+        print(f"Unexpected path: {name or None} ({n} picks)")
     
     # Check pick_video
     print("\nTesting pick_video...")
@@ -36,7 +33,12 @@ def diagnose():
         folder_path = os.path.join(assets_dir, "video", folder_name)
         video_path = matcher.pick_video(folder_path)
         print(f"Picked video from {folder_name}: {video_path}")
-        if not video_path or not os.path.exists(video_path):
+        # One directory scan per folder instead of a stat per checked file
+        existing = set()
+        if os.path.isdir(folder_path):
+            with os.scandir(folder_path) as it:
+                existing = {entry.path for entry in it}
+        if not video_path or video_path not in existing:
             print("  ERROR: File does not exist!")
 
 if __name__ == "__main__":
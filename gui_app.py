@@ -1,40 +1,125 @@
 import streamlit as st
 import os
-import json
 import time
-import pandas as pd
+import shutil
+import hashlib
+import orjson
 from datetime import datetime
-from src.models import MixConfig, FolderWeight
-from src.pipeline import AutoClipPipeline
-from src.utils import get_subfolders, get_video_files
+from concurrent.futures import ThreadPoolExecutor
+from itertools import zip_longest
+from src.models import MixConfig, folder_weight_adapter
+from src.utils import get_subfolders, get_audio_files, has_video_file, effective_cpu_count
 from src.config_manager import ConfigManager
 from pathlib import Path
-from src.preprocess import process_video, get_video_files as get_all_video_files
 
 # --- Helper Functions ---
+@st.cache_data(show_spinner=False)
+def _load_metadata(meta_path, mtime):
+    # mtime is only part of the cache key: a rewritten file gets re-parsed
+    return orjson.loads(Path(meta_path).read_bytes())
+
 def display_metadata(video_path):
     meta_path = video_path.replace('.mp4', '_metadata.json')
-    if os.path.exists(meta_path):
-        with st.expander("查看原始素材信息 (Source Metadata)", expanded=False):
-            try:
-                with open(meta_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                for chunk in data:
-                    t_start = chunk.get('timeline_start', 0)
-                    t_end = chunk.get('timeline_end', 0)
-                    speed = chunk.get('speed_factor', 1.0)
-                    st.markdown(f"**时间段: {t_start:.1f}s - {t_end:.1f}s (Speed: {speed}x)**")
+    # A single stat gives both the existence check and the cache key
+    try:
+        meta_mtime = os.stat(meta_path).st_mtime
+    except OSError:
+        return
+    with st.expander("查看原始素材信息 (Source Metadata)", expanded=False):
+        try:
+            data = _load_metadata(meta_path, meta_mtime)
+            
+            # Whole table as one markdown payload instead of widgets per chunk
+            lines = []
+            for chunk in data:
+                t_start = chunk.get('timeline_start', 0)
+                t_end = chunk.get('timeline_end', 0)
+                speed = chunk.get('speed_factor', 1.0)
+                lines.append(f"**时间段: {t_start:.1f}s - {t_end:.1f}s (Speed: {speed}x)**")
+                for seg in chunk.get('segments', []):
+                    src = os.path.basename(seg.get('source_file', 'Unknown'))
+                    s_start = seg.get('source_start', 0)
+                    s_end = seg.get('source_end', 0)
+                    lines.append(f"- 来源: `{src}` [{s_start:.1f}s - {s_end:.1f}s]")
+                lines.append("")
+            if lines:
+                st.markdown("\n".join(lines))
                     
-                    segments = chunk.get('segments', [])
-                    for seg in segments:
-                        src = os.path.basename(seg.get('source_file', 'Unknown'))
-                        s_start = seg.get('source_start', 0)
-                        s_end = seg.get('source_end', 0)
-                        st.text(f"  └─ 来源: {src} [{s_start:.1f}s - {s_end:.1f}s]")
-                        
-            except Exception as e:
-                st.error(f"无法读取元数据: {e}")
+        except Exception as e:
+            st.error(f"无法读取元数据: {e}")
+
+# Filesystem scans are memoized for a short time so newly dropped assets still appear
+SCAN_TTL = 30
+
+@st.cache_data(ttl=SCAN_TTL, show_spinner=False)
+def _list_bgm(bgm_dir):
+    return get_audio_files(bgm_dir)
+
+@st.cache_data(ttl=SCAN_TTL, show_spinner=False)
+def _list_video_subfolders(video_root):
+    return get_subfolders(video_root)
+
+@st.cache_data(ttl=SCAN_TTL, show_spinner=False)
+def _filter_nonempty(video_root, subfolders):
+    return [f for f in subfolders if has_video_file(os.path.join(video_root, f))]
+
+@st.cache_data(ttl=SCAN_TTL, show_spinner=False)
+def _list_all_videos(src_dir):
+    # Recursive walk over the whole asset tree (preprocessing input)
+    from src.preprocess import get_video_files as get_all_video_files
+    return get_all_video_files(src_dir)
+
+def save_upload(uploaded_file, target_dir):
+    """
+    Stream an UploadedFile to disk in 1 MiB chunks.
+    The target folder is a BLAKE2b digest of the content, so re-adding the same file skips the write.
+    The original file name is kept because the pipeline names output folders after it.
+    """
+    # getbuffer() is a view on the upload already held in memory; hashing it does not copy
+    key = hashlib.blake2b(uploaded_file.getbuffer(), digest_size=16).hexdigest()
+    path = os.path.join(target_dir, key, uploaded_file.name)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".part"
+        uploaded_file.seek(0)
+        with open(tmp_path, "wb") as f:
+            shutil.copyfileobj(uploaded_file, f, length=1024 * 1024)
+        os.replace(tmp_path, path)
+    return path
+
+def _new_pipeline(assets_dir, output_dir):
+    # Heavy import (moviepy) deferred until the first generation run. Not cached:
+    # run() mutates the matcher's rotation state, so each batch run (and so each
+    # browser session) gets its own instance; construction only builds a Matcher.
+    from src.pipeline import AutoClipPipeline
+    return AutoClipPipeline(assets_dir, output_dir)
+
+@st.cache_resource
+def _get_config_manager():
+    return ConfigManager()
+
+def _load_config():
+    # ConfigManager reparses only when the file's mtime changes (so outside edits are
+    # picked up) and hands out a copy, so callers may mutate.
+    return _get_config_manager().load_config()
+
+def _safe_replace(tmp_path, target_path, ok):
+    """
+    Move a preprocessed temp file over its source, or discard it if processing failed.
+    Runs on worker threads, so errors are returned (not shown) as (replaced, error_message).
+    """
+    if not ok:
+        try:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        except OSError:
+            pass
+        return False, None
+    try:
+        os.replace(tmp_path, target_path)
+        return True, None
+    except OSError as e:
+        return False, str(e)
 
 def get_index(options, target):
     try:
@@ -48,49 +133,73 @@ def render_queue_dataframe(placeholder):
     if not st.session_state['task_queue']:
         placeholder.write("队列为空 (Empty Queue)")
     else:
-        queue_display = []
+        import pandas as pd
+        # Columnar build (dict of lists) maps straight onto pandas' column blocks
+        cols = {"ID": [], "音频": [], "字幕": [], "转场": [], "数量": [], "状态": []}
         for t in st.session_state['task_queue']:
-            queue_display.append({
-                "ID": t["id"],
-                "音频": t["audio_name"],
-                "字幕": t["srt_name"],
-                "转场": f"{t['trans_type'].split(' ')[0]} ({t['trans_dur']}s)" if "无" not in t['trans_type'] else "无",
-                "数量": t["count"],
-                "状态": t["status"]
-            })
-        placeholder.dataframe(pd.DataFrame(queue_display), hide_index=True)
+            cols["ID"].append(t["id"])
+            cols["音频"].append(t["audio_name"])
+            cols["字幕"].append(t["srt_name"])
+            cols["转场"].append(f"{t['trans_type'].split(' ')[0]} ({t['trans_dur']}s)" if "无" not in t['trans_type'] else "无")
+            cols["数量"].append(t["count"])
+            cols["状态"].append(t["status"])
+        placeholder.dataframe(pd.DataFrame(cols), hide_index=True)
+
+# --- Directories (fixed for the lifetime of the process) ---
+@st.cache_resource
+def _dirs():
+    # Resolved (and temp_uploads created) once per process, not on every rerun
+    root = Path.cwd()
+    assets = root / "assets"
+    d = {
+        "assets": assets,
+        "output": root / "output",
+        "temp": root / "temp_uploads",
+        "bgm": assets / "bgm",
+        "video": assets / "video",
+    }
+    d["temp"].mkdir(exist_ok=True)
+    # Downstream code joins with os.path, so hand out plain strings
+    return {k: os.fspath(v) for k, v in d.items()}
+
+_d = _dirs()
+ASSETS_DIR = _d["assets"]
+OUTPUT_DIR = _d["output"]
+TEMP_UPLOAD_DIR = _d["temp"]
+BGM_DIR = _d["bgm"]
+VIDEO_ROOT = _d["video"]
 
 # --- Page Setup ---
 st.set_page_config(page_title="AutoClip Studio", layout="wide")
 
 # --- State Initialization ---
-if 'task_queue' not in st.session_state:
-    st.session_state['task_queue'] = []
-if 'uploader_key' not in st.session_state:
-    st.session_state['uploader_key'] = 0
-if 'save_config_requested' not in st.session_state:
-    st.session_state['save_config_requested'] = False
-if 'is_running' not in st.session_state:
-    st.session_state['is_running'] = False
+for _key, _default in (
+    ('task_queue', []),
+    ('uploader_key', 0),
+    ('save_config_requested', False),
+    ('is_running', False),
+):
+    st.session_state.setdefault(_key, _default)
 
 # Global disabled state
 is_locked = st.session_state['is_running']
 
 # --- Load Configuration ---
-cm = ConfigManager()
-config = cm.load_config()
-
-# Directories
-ASSETS_DIR = os.path.join(os.getcwd(), "assets")
-OUTPUT_DIR = os.path.join(os.getcwd(), "output")
-TEMP_UPLOAD_DIR = os.path.join(os.getcwd(), "temp_uploads")
-os.makedirs(TEMP_UPLOAD_DIR, exist_ok=True)
+cm = _get_config_manager()
+config = _load_config()
 
 st.title("🚀 AutoClip 智能混剪 (Task Queue Mode)")
 
 # --- Sidebar: Global Configuration ---
 st.sidebar.header("全局设置 (Global Settings)")
 
+# Directory scans are cached; force a refresh after adding/removing assets
+if st.sidebar.button("🔄 重新扫描素材 (Rescan assets)", disabled=is_locked):
+    _list_bgm.clear()
+    _list_video_subfolders.clear()
+    _filter_nonempty.clear()
+    _list_all_videos.clear()
+
 output_tag = st.sidebar.text_input(
     "输出文件夹标签 (前缀)", 
     value=config.get("output_tag", ""),
@@ -119,10 +228,7 @@ else:
 
 # Audio/Subtitle Style
 st.sidebar.divider()
-bgm_files = []
-bgm_dir = os.path.join(ASSETS_DIR, "bgm")
-if os.path.exists(bgm_dir):
-    bgm_files = [f for f in os.listdir(bgm_dir) if f.endswith(('.mp3', '.wav'))]
+bgm_files = _list_bgm(BGM_DIR)
 
 bgm_options = ["无 (None)"] + bgm_files
 bgm_selected = st.sidebar.selectbox(
@@ -144,12 +250,13 @@ with st.sidebar.expander("字幕样式配置"):
         sub_color = st.color_picker("字体颜色", value=config.get("sub_color", "#FFFFFF"), key="sub_color", disabled=is_locked)
         sub_shadow = st.number_input("阴影深度", value=config.get("sub_shadow", 1), min_value=0, key="sub_shadow", disabled=is_locked)
         sub_margin_v = st.number_input("垂直边距 (MarginV)", value=config.get("sub_margin_v", 15), min_value=0, key="sub_margin_v", disabled=is_locked)
+    sub_burn = st.checkbox("烧录字幕 (硬字幕)", value=config.get("sub_burn", True), key="sub_burn", disabled=is_locked,
+                           help="关闭后字幕作为软字幕轨道封装，编码更快，但样式由播放器决定")
 
 # Video Source Weights
 st.sidebar.divider()
 st.sidebar.subheader("视觉素材权重 (Global)")
-video_root = os.path.join(ASSETS_DIR, "video")
-subfolders = [f for f in get_subfolders(video_root) if get_video_files(os.path.join(video_root, f))]
+subfolders = _filter_nonempty(VIDEO_ROOT, _list_video_subfolders(VIDEO_ROOT))
 folder_weights = []
 current_weights_map = {}
 
@@ -169,53 +276,96 @@ else:
 
     saved_weights = config.get("folder_weights", {})
 
+    # Build one table (one widget) for all enabled folders instead of per-folder sliders
+    rows = []
     for folder in selected_ordered_subfolders:
-         # Extract saved values safely
-         fw_data = saved_weights.get(folder, 50)
-         if isinstance(fw_data, dict):
-             val_w = fw_data.get("weight", 50)
-             val_s = fw_data.get("speed", 1.0)
-             val_min = fw_data.get("clip_min_duration", 2.0)
-             val_max = fw_data.get("clip_max_duration", 4.0)
-         else:
-             val_w = fw_data if isinstance(fw_data, int) else 50
-             val_s = 1.0
-             val_min = 2.0
-             val_max = 4.0
-
-         c1, c2 = st.sidebar.columns([3, 1])
-         with c1:
-            val = st.slider(f"{folder}", 0, 100, val_w, key=f"w_{folder}", help=f"{folder} 权重", disabled=is_locked)
-         with c2:
-            spd = st.number_input("x", 0.1, 10.0, float(val_s), 0.1, key=f"s_{folder}", help=f"{folder} 播放倍数", disabled=is_locked)
-            
-         # Random Cut Config
-         final_min = 0.0
-         final_max = 0.0
-         if use_random_cuts:
-             st.sidebar.caption(f"👆 {folder} 单片段时长范围 (秒):")
-             c_r1, c_r2 = st.sidebar.columns(2)
-             with c_r1:
-                 final_min = st.number_input(f"Min (s)", 0.5, 60.0, float(val_min), 0.5, key=f"rmin_{folder}", label_visibility="collapsed", help=f"随机截取的最小片段时长 (秒)", disabled=is_locked)
-             with c_r2:
-                 final_max = st.number_input(f"Max (s)", 0.5, 60.0, float(val_max), 0.5, key=f"rmax_{folder}", label_visibility="collapsed", help=f"随机截取的最大片段时长 (秒)", disabled=is_locked)
-         
-         # Save structure for Config Manager (Complex Dict)
-         current_weights_map[folder] = {
-             "weight": val, 
-             "speed": spd,
-             "clip_min_duration": final_min,
-             "clip_max_duration": final_max
-         }
-         
-         # Construct Object for Pipeline
-         folder_weights.append(FolderWeight(
-             folder=folder, 
-             weight=val, 
-             speed=spd,
-             clip_min_duration=final_min,
-             clip_max_duration=final_max
-         ))
+        # Extract saved values safely
+        fw_data = saved_weights.get(folder, 50)
+        if isinstance(fw_data, dict):
+            rows.append({
+                "folder": folder,
+                "weight": int(fw_data.get("weight", 50)),
+                "speed": float(fw_data.get("speed", 1.0)),
+                "clip_min_duration": float(fw_data.get("clip_min_duration", 2.0) or 2.0),
+                "clip_max_duration": float(fw_data.get("clip_max_duration", 4.0) or 4.0)
+            })
+        else:
+            rows.append({
+                "folder": folder,
+                "weight": fw_data if isinstance(fw_data, int) else 50,
+                "speed": 1.0,
+                "clip_min_duration": 2.0,
+                "clip_max_duration": 4.0
+            })
+
+    import pandas as pd
+    weights_df = pd.DataFrame(rows, columns=["folder", "weight", "speed", "clip_min_duration", "clip_max_duration"])
+    column_config = {
+        "folder": st.column_config.TextColumn("文件夹", disabled=True),
+        "weight": st.column_config.NumberColumn("权重", required=True, min_value=0, max_value=100, step=1, help="时长权重"),
+        "speed": st.column_config.NumberColumn("倍速", required=True, min_value=0.1, max_value=10.0, step=0.1, format="%.1fx", help="播放倍数"),
+        "clip_min_duration": st.column_config.NumberColumn("Min (s)", required=True, min_value=0.5, max_value=60.0, step=0.5, help="随机截取的最小片段时长 (秒)"),
+        "clip_max_duration": st.column_config.NumberColumn("Max (s)", required=True, min_value=0.5, max_value=60.0, step=0.5, help="随机截取的最大片段时长 (秒)"),
+    }
+    column_order = ["folder", "weight", "speed"]
+    if use_random_cuts:
+        column_order += ["clip_min_duration", "clip_max_duration"]
+
+    # Edits are stored positionally, so key the editor on the folder selection
+    editor_key = hashlib.blake2b("|".join(selected_ordered_subfolders).encode("utf-8"), digest_size=8).hexdigest()
+    # Inside a form, cell edits are batched: the script reruns once on Apply, not per edit
+    with st.sidebar.form("weights_form", border=False):
+        edited = st.data_editor(
+            weights_df,
+            column_config=column_config,
+            column_order=column_order,
+            num_rows="fixed",
+            hide_index=True,
+            key=f"weights_editor_{editor_key}",
+            disabled=is_locked
+        )
+        st.form_submit_button("✅ 应用权重 (Apply)", disabled=is_locked)
+
+    # A cleared cell comes back as NaN: fall back to the row defaults instead of failing int()/float()
+    edited = edited.fillna({"weight": 50, "speed": 1.0, "clip_min_duration": 2.0, "clip_max_duration": 4.0})
+
+    # Vectorized share of the timeline per folder (all zero -> no shares shown)
+    total_w = edited["weight"].sum()
+    pcts = edited["weight"] * (100.0 / total_w) if total_w > 0 else [None] * len(edited)
+    share_parts = []
+    fw_rows = []
+
+    # Single pass: share caption, config map and pipeline objects
+    for r, pct in zip(edited.itertuples(index=False), pcts):
+        val = int(r.weight)
+        spd = float(r.speed)
+        val_min = float(r.clip_min_duration)
+        val_max = float(r.clip_max_duration)
+        if pct is not None:
+            share_parts.append(f"{r.folder}: {pct:.0f}%")
+
+        # Save structure for Config Manager (Complex Dict)
+        current_weights_map[r.folder] = {
+            "weight": val,
+            "speed": spd,
+            "clip_min_duration": val_min,
+            "clip_max_duration": val_max
+        }
+
+        # Row for the pipeline objects (random cut range only applies when enabled)
+        fw_rows.append({
+            "folder": r.folder,
+            "weight": val,
+            "speed": spd,
+            "clip_min_duration": val_min if use_random_cuts else 0.0,
+            "clip_max_duration": val_max if use_random_cuts else 0.0
+        })
+
+    # Validate all rows in one call
+    folder_weights = folder_weight_adapter().validate_python(fw_rows)
+
+    if share_parts:
+        st.sidebar.caption(" | ".join(share_parts))
 
 if st.sidebar.button("💾 保存配置 (Save Config)", disabled=is_locked):
     st.session_state['save_config_requested'] = True
@@ -239,12 +389,14 @@ with st.sidebar.expander("一键格式化 (Pre-process)", expanded=False):
     overwrite_src = st.checkbox("⚠️ 覆盖原文件 (Overwrite)", value=True, help="警告：处理成功后将直接替换原始文件，操作不可逆！", disabled=is_locked)
         
     if st.button("🚀 开始处理", disabled=is_locked):
-        src_dir = os.path.join(ASSETS_DIR, "video")
+        # Imported on demand: not needed for ordinary reruns
+        from src.preprocess import batch_process_parallel
+        src_dir = VIDEO_ROOT
         
         if not os.path.exists(src_dir):
             st.error(f"源文件夹不存在: {src_dir}")
         else:
-            files_to_proc = get_all_video_files(src_dir)
+            files_to_proc = _list_all_videos(src_dir)
             if not files_to_proc:
                 st.warning("源文件夹中没有视频文件。")
             else:
@@ -262,6 +414,12 @@ with st.sidebar.expander("一键格式化 (Pre-process)", expanded=False):
                 # Prepare tasks list
                 tasks = []
                 
+                # One recursive scan of the output tree instead of an exists() stat per file
+                existing_outputs = set()
+                if not overwrite_src:
+                    for root, _, names in os.walk(dst_dir):
+                        existing_outputs.update(os.path.normpath(os.path.join(root, n)) for n in names)
+                
                 # Logic to prepare tasks
                 for fpath in files_to_proc:
                     if overwrite_src:
@@ -272,7 +430,7 @@ with st.sidebar.expander("一键格式化 (Pre-process)", expanded=False):
                         out_path = str(Path(out_path_full).with_suffix('.mp4'))
                         
                         # Skip if exists and not overwrite (simple check before safe process)
-                        if os.path.exists(out_path):
+                        if os.path.normpath(out_path) in existing_outputs:
                             continue
                             
                     tasks.append((fpath, out_path, pp_w, pp_h))
@@ -280,10 +438,8 @@ with st.sidebar.expander("一键格式化 (Pre-process)", expanded=False):
                 if not tasks:
                     st.info("所有文件已存在或无需处理。")
                 else:
-                    from src.preprocess import batch_process_parallel
-                    
                     # Use 50% of cores by default for GUI
-                    max_workers = max(1, os.cpu_count() // 2)
+                    max_workers = max(1, effective_cpu_count() // 2)
                     st.write(f"正在使用 {max_workers} 个并行进程处理...")
 
                     def update_progress(curr, total):
@@ -294,26 +450,28 @@ with st.sidebar.expander("一键格式化 (Pre-process)", expanded=False):
                     
                     # Post-processing for overwrite mode
                     if overwrite_src:
-                        for i, (fpath, tmp_path, _, _) in enumerate(tasks):
-                            if results[i]: # If success
-                                try:
-                                    os.replace(tmp_path, fpath)
-                                    success_count += 1
-                                except Exception as e:
-                                    st.error(f"Replace failed: {e}")
-                            else:
-                                if os.path.exists(tmp_path):
-                                    os.remove(tmp_path)
+                        # Replaces are syscall-bound (slow on network shares): run them on threads
+                        replace_jobs = [(tmp_path, fpath, ok) for (fpath, tmp_path, _, _), ok in zip(tasks, results)]
+                        with ThreadPoolExecutor(max_workers=min(32, effective_cpu_count() * 4)) as ex:
+                            outcomes = list(ex.map(lambda job: _safe_replace(*job), replace_jobs))
+                        for replaced, err in outcomes:
+                            if replaced:
+                                success_count += 1
+                            elif err:
+                                st.error(f"Replace failed: {err}")
                     else:
                         success_count = sum(results) + (len(files_to_proc) - len(tasks)) # Add skipped ones
                 
+                # Preprocessing changed the asset tree
+                _list_all_videos.clear()
                 pp_status.success(f"处理完成！成功: {success_count}/{len(files_to_proc)}")
 
 # --- Main Interface ---
 
-col1, col2 = st.columns([1, 1], gap="large")
-
-with col1:
+# Panels are fragments: their own widgets rerun only the panel, not the whole script.
+# Anything that changes app-wide state (queue contents, run lock) still triggers a full rerun.
+@st.fragment
+def add_task_panel():
     st.subheader("1. 添加任务 (Add Task)")
     st.info("上传音频和字幕，添加到待处理队列。")
     
@@ -339,16 +497,12 @@ with col1:
                 st.error("必须上传音频文件！")
             else:
                 # 1. Save Files
-                audio_path = os.path.join(TEMP_UPLOAD_DIR, uploaded_audio.name)
-                with open(audio_path, "wb") as f:
-                    f.write(uploaded_audio.getbuffer())
+                audio_path = save_upload(uploaded_audio, TEMP_UPLOAD_DIR)
                 
                 srt_path = None
                 srt_display = "Auto Check"
                 if uploaded_srt:
-                    srt_path = os.path.join(TEMP_UPLOAD_DIR, uploaded_srt.name)
-                    with open(srt_path, "wb") as f:
-                        f.write(uploaded_srt.getbuffer())
+                    srt_path = save_upload(uploaded_srt, TEMP_UPLOAD_DIR)
                     srt_display = uploaded_srt.name
                 
                 # 2. Add to Session State
@@ -370,26 +524,31 @@ with col1:
                 st.success(f"任务已添加: {uploaded_audio.name}")
                 st.rerun()
 
-with col2:
+def _clear_queue():
+    st.session_state['task_queue'] = []
+
+def _request_run():
+    # Flag consumed once by queue_panel; is_running then locks the UI
+    st.session_state['run_batch'] = True
+
+@st.fragment
+def queue_panel():
     st.subheader("2. 任务队列 (Queue)")
     
-    if not st.session_state['task_queue']:
-        # Placeholder for empty state or table
-        queue_placeholder = st.empty()
-        render_queue_dataframe(queue_placeholder)
-    else:
-        queue_placeholder = st.empty()
-        render_queue_dataframe(queue_placeholder)
-        
+    # Placeholder is returned so the execution loop can refresh task status in place
+    queue_placeholder = st.empty()
+    render_queue_dataframe(queue_placeholder)
+    
+    if st.session_state['task_queue']:
         c_act1, c_act2 = st.columns(2)
-        if c_act1.button("🗑️ 清空队列", disabled=is_locked):
-            st.session_state['task_queue'] = []
-            st.rerun()
+        # Callback runs before the fragment rerun, so the table above redraws empty
+        # without a full-app rerun of the sidebar scans and weight table
+        c_act1.button("🗑️ 清空队列", disabled=is_locked, on_click=_clear_queue)
         
         # Start Button Logic
         if not is_locked:
-            start_btn = c_act2.button("🎬 开始批量生成", type="primary")
-            if start_btn:
+            c_act2.button("🎬 开始批量生成", type="primary", on_click=_request_run)
+            if st.session_state.pop('run_batch', False):
                 # Basic Checks
                 if not folder_weights:
                      st.error("错误：未配置视频素材权重。")
@@ -400,6 +559,16 @@ with col2:
                     st.rerun()
         else:
             c_act2.button("⏳ 正在生成... (UI已锁定)", disabled=True)
+    
+    return queue_placeholder
+
+col1, col2 = st.columns([1, 1], gap="large")
+
+with col1:
+    add_task_panel()
+
+with col2:
+    queue_placeholder = queue_panel()
 
 
 # --- Execution Logic (Auto Triggered if Locked) ---
@@ -413,7 +582,7 @@ if st.session_state.get('is_running'):
         st.rerun()
         st.stop()
     
-    pipeline = AutoClipPipeline(ASSETS_DIR, OUTPUT_DIR)
+    pipeline = _new_pipeline(ASSETS_DIR, OUTPUT_DIR)
     
     main_progress = st.progress(0)
     main_status = st.empty()
@@ -443,6 +612,7 @@ if st.session_state.get('is_running'):
             subtitle_shadow=sub_shadow,
             subtitle_margin_v=sub_margin_v,
             subtitle_bold=sub_bold,
+            burn_subtitles=sub_burn,
             output_tag=output_tag,
             # Fix: Extract English key from "中文 (English)" format
             transition_type=task.get('trans_type', "无").split("(")[-1].strip(")") if "(" in task.get('trans_type', "") else "None",
@@ -462,6 +632,9 @@ if st.session_state.get('is_running'):
             render_queue_dataframe(queue_placeholder)
             all_results.extend(results)
             st.success(f"任务 {task_id} 完成! 生成 {len(results)} 个视频。")
+            # Settings the fallback encoder could not honour (e.g. crossfade)
+            for warning in pipeline.warnings:
+                st.warning(f"任务 {task_id}: {warning}")
             
         except Exception as e:
             task['status'] = 'Error'
@@ -487,12 +660,18 @@ if st.session_state.get('is_running'):
     
     st.rerun()
 
-# --- Execution Area (Old button block removed) ---
-# st.divider()
-# if 'start_btn' in locals() and start_btn: ... (Removed)
-
 # --- Results Display (Persisted) ---
-if st.session_state.get('generated_results'):
+def _render_result(col, path, name):
+    if path is None:
+        return
+    with col:
+        st.write(f"📁 `{name}`")
+        st.video(path)
+        display_metadata(path)
+
+@st.fragment
+def results_panel():
+    # Fragment: widgets in here rerun only this grid, not the sidebar scans
     st.write("---")
     st.subheader("生成结果预览 (Results)")
     
@@ -501,23 +680,24 @@ if st.session_state.get('generated_results'):
         del st.session_state['generated_results']
         st.rerun()
     
+    # Rendered from session state: reruns never touch the pipeline again
     res_files = st.session_state['generated_results']
+    res_names = [os.path.basename(r) for r in res_files]
     
     if not res_files:
         st.warning("结果列表为空。")
     else:
-         for i in range(0, len(res_files), 2):
-            cols = st.columns(2)
-            with cols[0]:
-                st.write(f"📁 `{os.path.basename(res_files[i])}`")
-                st.video(res_files[i])
-                display_metadata(res_files[i])
-            
-            if i + 1 < len(res_files):
-                with cols[1]:
-                    st.write(f"📁 `{os.path.basename(res_files[i+1])}`")
-                    st.video(res_files[i+1])
-                    display_metadata(res_files[i+1])
+        for (a, a_name), (b, b_name) in zip_longest(
+            zip(res_files[::2], res_names[::2]),
+            zip(res_files[1::2], res_names[1::2]),
+            fillvalue=(None, None),
+        ):
+            c0, c1 = st.columns(2)
+            _render_result(c0, a, a_name)
+            _render_result(c1, b, b_name)
+
+if st.session_state.get('generated_results'):
+    results_panel()
 
 # --- Handle Save Config ---
 if st.session_state.get('save_config_requested'):
@@ -537,6 +717,7 @@ if st.session_state.get('save_config_requested'):
         "sub_color": sub_color,
         "sub_shadow": sub_shadow,
         "sub_margin_v": sub_margin_v,
+        "sub_burn": sub_burn,
         # Folders
         "ordered_folders": st.session_state.get("ordered_folders_multiselect", []),
         "folder_weights": current_weights_map,
@@ -1,4 +1,5 @@
 import os
+import subprocess
 import sys
 
 def main():
@@ -6,10 +7,14 @@ def main():
     Launch the Streamlit UI for AutoClip.
     """
     print("Launching AutoClip Studio UI...")
-    # Use os.system to run the streamlit command
-    # This assumes streamlit is installed and in the path, which it should be based on requirements.
-    exit_code = os.system("streamlit run gui_app.py")
-    sys.exit(exit_code)
+    # Run streamlit through the current interpreter, without a shell, so it
+    # works even when the streamlit script is not on PATH.
+    cmd = [sys.executable, "-m", "streamlit", "run", "gui_app.py"]
+    if os.name == "posix":
+        # Replace this process so Ctrl-C and exit codes go straight to streamlit
+        os.execv(sys.executable, cmd)
+    # os.exec* on Windows spawns a detached child, so wait on it instead
+    sys.exit(subprocess.call(cmd))
 
 if __name__ == "__main__":
     main()
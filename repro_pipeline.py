@@ -1,53 +1,61 @@
-
 import os
-import shutil
-import src.processors.tts
 from src.pipeline import AutoClipPipeline
 from src.models import MixConfig, FolderWeight
 
-# Mock TTS to avoid network calls and speed up test
-def mock_run_tts_sync(text, voice, output_file):
-    print(f"Mock TTS: {text} -> {output_file}")
-    # Create a dummy MP3 (copy sample bgm if exists, or create empty file)
-    # We need a valid audio file for MoviePy.
-    # Let's generate a simple sine wave using moviepy if needed, 
-    # but here let's assume assets/bgm/sample_bgm.mp3 exists from setup.
-    bgm_path = "assets/bgm/sample_bgm.mp3"
-    if os.path.exists(bgm_path):
-        shutil.copy(bgm_path, output_file)
-    else:
-        # Create a tiny valid mp3? Or just fail if setup wasn't run.
-        # Let's try to just write some bytes or use moviepy to make one?
-        # Simpler: use the one from setup_assets.py
-        pass
-
-src.processors.tts.run_tts_sync = mock_run_tts_sync
+SAMPLE_SRT = """1
+00:00:00,000 --> 00:00:02,500
+Sentence 1.
+
+2
+00:00:02,500 --> 00:00:05,000
+Sentence 2.
+
+3
+00:00:05,000 --> 00:00:07,500
+Sentence 3.
+
+4
+00:00:07,500 --> 00:00:10,000
+Sentence 4.
+"""
 
 def test_pipeline():
     assets_dir = os.path.join(os.getcwd(), "assets")
     output_dir = os.path.join(os.getcwd(), "output")
-    
+
     print(f"Assets: {assets_dir}")
     print(f"Output: {output_dir}")
-    
+
+    # The pipeline takes a recorded voice track; use the sample BGM from setup_assets.py
+    audio_path = os.path.join(assets_dir, "bgm", "sample_bgm.mp3")
+    if not os.path.exists(audio_path):
+        print(f"Missing {audio_path}: run setup_assets.py first.")
+        return
+
+    # Ready-made subtitles, so the run does not need the ASR model
+    os.makedirs(output_dir, exist_ok=True)
+    srt_path = os.path.join(output_dir, "repro.srt")
+    with open(srt_path, "w", encoding="utf-8") as f:
+        f.write(SAMPLE_SRT)
+
     pipeline = AutoClipPipeline(assets_dir, output_dir)
-    
+
     # Config with 50/50 weights
     folder_weights = [
         FolderWeight(folder="minecraft", weight=50),
         FolderWeight(folder="nature", weight=50)
     ]
-    
+
     config = MixConfig(
-        text="Sentence 1.\nSentence 2.\nSentence 3.\nSentence 4.",
-        voice="zh-CN-XiaoxiaoNeural",
+        audio_path=audio_path,
+        srt_path=srt_path,
         folder_weights=folder_weights,
         batch_count=1,
         width=1080,
         height=1920,
         bgm_file=None # No BGM mixing to keep it simple
     )
-    
+
     print("Running pipeline...")
     results = pipeline.run(config)
     print("Done.")
@@ -1,6 +1,8 @@
 import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import numpy as np
-from moviepy.editor import ColorClip, AudioFileClip, AudioClip
+from src.utils import get_h264_encoder, h264_encode_args
 
 def create_dirs():
     dirs = [
@@ -11,39 +13,68 @@ def create_dirs():
         "assets/video/nature",
         "output"
     ]
+    # Parents come first in the list, so a plain mkdir is enough; existing dirs cost one stat
     for d in dirs:
-        os.makedirs(d, exist_ok=True)
+        if os.path.isdir(d):
+            continue
+        os.mkdir(d)
         print(f"Created directory: {d}")
 
+def _lavfi_color(path, rgb, w=1080, h=1920, d=5, fps=24):
+    """
+    Encode a solid-colour clip straight from FFmpeg's lavfi color source,
+    so no frames pass through Python.
+    """
+    color = f"0x{rgb[0]:02x}{rgb[1]:02x}{rgb[2]:02x}"
+    # Hardware encoder when one works here (probed once, see src.utils)
+    encode_args = h264_encode_args(preset="ultrafast")
+    if get_h264_encoder() == "libx264":
+        encode_args += ["-tune", "stillimage"]
+    cmd = [
+        "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+        "-f", "lavfi", "-i", f"color=c={color}:s={w}x{h}:r={fps}:d={d}",
+        *encode_args,
+        "-pix_fmt", "yuv420p", "-threads", "2", path
+    ]
+    subprocess.run(cmd, check=True)
+
 def create_dummy_videos():
-    # Create some dummy videos
+    # Create some dummy videos: 5 seconds, 1080x1920 (Vertical)
+    jobs = []
     # 1. Minecraft (Green-ish)
-    print("Generating sample videos for 'minecraft'...")
     for i in range(3):
-        # 5 seconds, 1080x1920 (Vertical)
-        clip = ColorClip(size=(1080, 1920), color=(50, 205 + i*10, 50), duration=5)
-        clip.fps = 24
-        filename = f"assets/video/minecraft/sample_mc_{i}.mp4"
-        clip.write_videofile(filename, codec="libx264", audio=False, logger=None)
-        print(f"  Generated {filename}")
-
+        jobs.append((f"assets/video/minecraft/sample_mc_{i}.mp4", (50, 205 + i*10, 50)))
     # 2. Nature (Blue-ish)
-    print("Generating sample videos for 'nature'...")
     for i in range(3):
-        # 5 seconds, 1080x1920 (Vertical)
-        clip = ColorClip(size=(1080, 1920), color=(100, 100, 200 + i*10), duration=5)
-        clip.fps = 24
-        filename = f"assets/video/nature/sample_nature_{i}.mp4"
-        clip.write_videofile(filename, codec="libx264", audio=False, logger=None)
-        print(f"  Generated {filename}")
+        jobs.append((f"assets/video/nature/sample_nature_{i}.mp4", (100, 100, 200 + i*10)))
+
+    print("Generating sample videos for 'minecraft' and 'nature'...")
+    # Each job is an ffmpeg subprocess, so threads are enough to run them side by side
+    with ThreadPoolExecutor(max_workers=min(len(jobs), os.cpu_count() or 1)) as ex:
+        futures = {ex.submit(_lavfi_color, path, rgb): path for path, rgb in jobs}
+        for fut in as_completed(futures):
+            fut.result()
+            print(f"  Generated {futures[fut]}")
 
 def create_dummy_bgm():
     print("Generating sample BGM...")
-    # 10 seconds of silence/tone
-    make_frame = lambda t: np.sin(2 * np.pi * 440 * t) # 440 Hz sine wave
-    clip = AudioClip(make_frame, duration=10, fps=44100)
+    # 10 seconds of a 440 Hz sine tone
     filename = "assets/bgm/sample_bgm.mp3"
-    clip.write_audiofile(filename, fps=44100, logger=None)
+    cmd = [
+        "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+        "-f", "lavfi", "-i", "sine=frequency=440:duration=10:sample_rate=44100",
+        "-c:a", "libmp3lame", "-b:a", "128k", filename
+    ]
+    try:
+        subprocess.run(cmd, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        # No usable ffmpeg on PATH: build the wave in one NumPy call and let
+        # MoviePy (bundled ffmpeg) encode it
+        from moviepy.audio.AudioClip import AudioArrayClip
+        fps = 44100
+        t = np.arange(fps * 10, dtype=np.float32) / fps
+        wave = np.sin(2 * np.pi * 440 * t)
+        AudioArrayClip(wave[:, None], fps=fps).write_audiofile(filename, fps=fps, logger=None)
     print(f"  Generated {filename}")
 
 if __name__ == "__main__":
@@ -54,4 +85,4 @@ if __name__ == "__main__":
         print("Success! Asset files generated.")
     except Exception as e:
         print(f"Error generating assets: {e}")
-        # If moviepy fails (e.g. ffmpeg missing), we still have the dirs.
+        # If ffmpeg is missing or fails, we still have the dirs.
@@ -1,6 +1,8 @@
-import json
 import os
-from typing import Dict, Any
+import copy
+import orjson
+from pathlib import Path
+from typing import Dict, Any, Tuple
 
 CONFIG_FILE = "user_config.json"
 
@@ -19,6 +21,7 @@ DEFAULT_CONFIG = {
     "sub_color": "#FFFFFF",
     "sub_shadow": 1,
     "sub_margin_v": 15,
+    "sub_burn": True,
     "bgm_selected": "无 (None)",
     "output_tag": "",
     # Folder weights will be stored as a list of dicts or a dict: {"folder_name": weight}
@@ -27,30 +30,58 @@ DEFAULT_CONFIG = {
 }
 
 class ConfigManager:
+    # config path -> (st_mtime_ns, merged config) of the last parse
+    _loaded: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+
     def __init__(self, config_file: str = CONFIG_FILE):
         self.config_file = config_file
 
     def load_config(self) -> Dict[str, Any]:
-        """Load config from file, or return defaults if not found."""
-        if not os.path.exists(self.config_file):
-            return DEFAULT_CONFIG.copy()
+        """
+        Load config from file, or return defaults if not found.
+        The parsed result is reused while the file's mtime is unchanged;
+        callers always get their own copy.
+        """
+        try:
+            mtime = os.stat(self.config_file).st_mtime_ns
+        except OSError:
+            return dict(DEFAULT_CONFIG)
+        
+        cached = self._loaded.get(self.config_file)
+        if cached and cached[0] == mtime:
+            return copy.deepcopy(cached[1])
         
         try:
-            with open(self.config_file, 'r', encoding='utf-8') as f:
-                saved_config = json.load(f)
-                # Merge with default to ensure all keys exist (in case of updates)
-                config = DEFAULT_CONFIG.copy()
-                config.update(saved_config)
-                return config
+            saved_config = orjson.loads(Path(self.config_file).read_bytes())
+            # Merge with default to ensure all keys exist (in case of updates)
+            config = {**DEFAULT_CONFIG, **saved_config}
         except Exception as e:
             print(f"Error loading config: {e}")
-            return DEFAULT_CONFIG.copy()
+            return dict(DEFAULT_CONFIG)
+        self._loaded[self.config_file] = (mtime, config)
+        return copy.deepcopy(config)
 
     def save_config(self, config_data: Dict[str, Any]):
-        """Save the provided configuration dict to file."""
+        """
+        Save the provided configuration dict to file.
+        Writes atomically (temp file + os.replace) and skips the write if the
+        file on disk already holds exactly this content.
+        """
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(config_data, f, indent=4, ensure_ascii=False)
+            payload = orjson.dumps(config_data, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+            try:
+                # Compare with the file itself, not the last write: an outside edit must not look like a no-op
+                if Path(self.config_file).read_bytes() == payload:
+                    return True
+            except OSError:
+                pass
+            
+            tmp_file = self.config_file + ".tmp"
+            with open(tmp_file, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_file, self.config_file)
+            # Don't trust mtime alone: coarse filesystem clocks may not advance
+            self._loaded.pop(self.config_file, None)
             return True
         except Exception as e:
             print(f"Error saving config: {e}")
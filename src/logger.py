@@ -1,5 +1,34 @@
 import logging
 import sys
+import time
+
+class _CachedFormatter(logging.Formatter):
+    """
+    Formatter that runs strftime at most once per wall-clock second.
+    The datefmt has no sub-second field, so every record within a second
+    gets the same timestamp string.
+    """
+    _last = (-1, '')  # (second, formatted); swapped as one tuple so threads never see a torn pair
+
+    def formatTime(self, record, datefmt=None):
+        sec = int(record.created)
+        last_sec, last_str = self._last
+        if sec != last_sec:
+            last_str = time.strftime(datefmt or self.datefmt or self.default_time_format, self.converter(sec))
+            self._last = (sec, last_str)
+        return last_str
+
+# Format: [Timestamp] [LoggerName] Message
+# Matches the previous style: [2025-12-28 14:00:00] [Matcher] ...
+_FORMATTER = _CachedFormatter(
+    '[%(asctime)s] [%(name)s] %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+
+# One stdout handler shared by every AutoClip logger (%(name)s tells them apart).
+# Use stdout to ensure it's captured by Streamlit or CLI
+_HANDLER = logging.StreamHandler(sys.stdout)
+_HANDLER.setFormatter(_FORMATTER)
 
 def setup_logger(name: str) -> logging.Logger:
     """
@@ -7,21 +36,13 @@ def setup_logger(name: str) -> logging.Logger:
     Adheres to KISS principle: Simple console output, standard format.
     """
     logger = logging.getLogger(name)
-    
-    # Only add handler if it doesn't have one (prevent duplicate logs)
-    if not logger.handlers:
-        logger.setLevel(logging.INFO)
-        
-        # Use stdout to ensure it's captured by Streamlit or CLI
-        handler = logging.StreamHandler(sys.stdout)
-        
-        # Format: [Timestamp] [LoggerName] Message
-        # Matches the previous style: [2025-12-28 14:00:00] [Matcher] ...
-        formatter = logging.Formatter(
-            '[%(asctime)s] [%(name)s] %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-        
+
+    # Configure each logger once (prevent duplicate logs)
+    if getattr(logger, "_ac_configured", False):
+        return logger
+    logger.setLevel(logging.INFO)
+    if _HANDLER not in logger.handlers:
+        logger.addHandler(_HANDLER)
+    logger._ac_configured = True
+
     return logger
@@ -1,17 +1,33 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from functools import lru_cache
+from pydantic import BaseModel, ConfigDict, TypeAdapter
+from typing import List, Tuple, Optional
 
 class FolderWeight(BaseModel):
+    # Frozen: instances are hashable and never mutated after the UI builds them
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     folder: str
     weight: int
     speed: float = 1.0
     clip_min_duration: float = 0.0
     clip_max_duration: float = 0.0
 
+@lru_cache(maxsize=None)
+def folder_weight_adapter() -> TypeAdapter:
+    """
+    Validator for a list of FolderWeight dicts, built once per process.
+    validate_python() checks the whole list in one call instead of one model per row.
+    """
+    return TypeAdapter(List[FolderWeight])
+
 class MixConfig(BaseModel):
+    # Frozen like FolderWeight; extra="forbid" rejects stale keywords (e.g. text/voice)
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     audio_path: str
     srt_path: Optional[str] = None
-    folder_weights: List[FolderWeight]
+    # Tuple (not List) so a frozen MixConfig stays hashable; lists are accepted as input
+    folder_weights: Tuple[FolderWeight, ...]
     batch_count: int = 1
     width: int = 1080
     height: int = 1920
@@ -31,3 +47,5 @@ class MixConfig(BaseModel):
     subtitle_shadow: int = 1
     subtitle_margin_v: int = 15
     subtitle_bold: bool = True
+    # False: mux the SRT as a soft (mov_text) track instead of rendering it into the frames
+    burn_subtitles: bool = True
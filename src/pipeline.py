@@ -1,37 +1,184 @@
 import os
+import re
 import json
+import shutil
+import hashlib
 import time
-import pysrt
+import subprocess
+import multiprocessing
+import concurrent.futures
 from datetime import datetime
-from typing import List
-from moviepy.editor import concatenate_videoclips, AudioFileClip, CompositeVideoClip, CompositeAudioClip, VideoFileClip
-from moviepy.video.VideoClip import ColorClip
-from moviepy.video.fx.all import speedx
+from functools import lru_cache
+from typing import List, Optional, Tuple
+from moviepy.editor import concatenate_videoclips, AudioFileClip, CompositeAudioClip, VideoFileClip
 
 from src.models import MixConfig
 # from src.utils import split_text # No longer needed
 from src.processors.asr import generate_srt
 from src.processors.matcher import Matcher
+from src.processors.renderer import render_part
 from src.logger import setup_logger
+from src.utils import effective_cpu_count, get_h264_encoder, h264_encode_args, probe_duration
 
 logger = setup_logger("Pipeline")
 
+# Every part is written with identical stream parameters so the concat demuxer
+# can join them at the packet level (no decoder reconfiguration between files)
+PART_FPS = 24
+PART_FFMPEG_PARAMS = ["-pix_fmt", "yuv420p", "-video_track_timescale", "12288"]
+# x264 preset of the deliverable: near-ultrafast speed, noticeably smaller files.
+# Parts stay on ultrafast (throwaway intermediates).
+FINAL_PRESET = "superfast"
+# ASR output keyed by the audio file's identity, so re-runs on the same voice track skip FunASR
+SRT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "autoclip", "srt")
+# Final encodes allowed to run at once (each overlaps the next batch's chunk renders)
+MAX_CONCURRENT_FINALS = 2
+
+# SRT timing line: "HH:MM:SS,mmm --> HH:MM:SS,mmm" (some tools write '.' before the millis)
+_SRT_TIMING = re.compile(r"^(\d+):(\d\d):(\d\d)[,.](\d{3})(\s*-->\s*)(\d+):(\d\d):(\d\d)[,.](\d{3})", re.MULTILINE)
+# key=value lines written by `ffmpeg -progress`
+_PROGRESS_LINE = re.compile(r"^\w+=\S*$")
+
+def _write_concat_list(list_path: str, files: List[str]):
+    """Write an ffmpeg concat-demuxer list for `files`, in order."""
+    with open(list_path, 'w', encoding='utf-8') as f:
+        for file in files:
+            # ffmpeg requires forward slashes and safe paths
+            p_abs = os.path.abspath(file).replace('\\', '/')
+            f.write(f"file '{p_abs}'\n")
+
+def _run_ffmpeg(cmd: List[str], total_duration: float = 0.0, on_progress=None):
+    """
+    Run an ffmpeg command, raising RuntimeError with its stderr on failure.
+    If on_progress is given, it is called with the encoded fraction (0-1) of
+    total_duration as ffmpeg reports its output time.
+    """
+    if on_progress:
+        cmd = [cmd[0], "-progress", "pipe:2", "-nostats", *cmd[1:]]
+    process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    log_lines = []
+    for line in process.stderr:
+        if on_progress and line.startswith("out_time="):
+            # out_time=HH:MM:SS.micro ("N/A" until the first frame is written)
+            try:
+                h, m, sec = line[len("out_time="):].strip().split(":")
+                done = int(h) * 3600 + int(m) * 60 + float(sec)
+            except ValueError:
+                continue
+            if total_duration > 0:
+                on_progress(min(1.0, max(0.0, done / total_duration)))
+        elif not (on_progress and _PROGRESS_LINE.match(line)):
+            log_lines.append(line)
+    process.wait()
+    if process.returncode != 0:
+        logger.error(f"FFmpeg Error: {''.join(log_lines)}")
+        raise RuntimeError("FFmpeg encoding failed.")
+
+def _xfade_filter(durations: List[float], trans_dur: float) -> str:
+    """
+    Filtergraph chaining xfade over inputs 0..N-1 (one per block) into [vx].
+    Each blend starts trans_dur before the end of everything joined so far.
+    """
+    # A transition can't be longer than the blocks it blends
+    trans_dur = min(trans_dur, min(durations) / 2)
+    steps = []
+    prev = "[0:v]"
+    length = durations[0]
+    for k in range(1, len(durations)):
+        offset = length - trans_dur
+        out = "[vx]" if k == len(durations) - 1 else f"[x{k}]"
+        steps.append(f"{prev}[{k}:v]xfade=transition=fade:duration={trans_dur:.3f}:offset={offset:.3f}{out}")
+        prev = out
+        length = offset + durations[k]
+    return ";".join(steps)
+
+def _shift_srt(text: str, seconds: float) -> Tuple[str, int]:
+    """
+    Shift every cue in SRT `text` by `seconds` (clamped at 0) with one regex pass.
+    Returns the shifted text and the number of cues.
+    """
+    delta = round(seconds * 1000)
+
+    def fmt(h, m, s, ms):
+        t = max(0, ((int(h) * 60 + int(m)) * 60 + int(s)) * 1000 + int(ms) + delta)
+        return f"{t // 3600000:02d}:{t // 60000 % 60:02d}:{t // 1000 % 60:02d},{t % 1000:03d}"
+
+    def shift(match):
+        g = match.groups()
+        return f"{fmt(*g[0:4])}{g[4]}{fmt(*g[5:9])}"
+
+    return _SRT_TIMING.subn(shift, text)
+
+def _srt_cache_path(audio_path: str) -> str:
+    """Cache file for the ASR subtitles of audio_path (path + size + mtime, so edits invalidate it)."""
+    st = os.stat(audio_path)
+    key = f"{os.path.abspath(audio_path)}|{st.st_size}|{st.st_mtime_ns}"
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).hexdigest()
+    return os.path.join(SRT_CACHE_DIR, f"{digest}.srt")
+
+def _filter_escape(value: str) -> str:
+    """
+    Escape a filter option value for use inside an ffmpeg filtergraph.
+    Two levels, as in ffmpeg's "Notes on filtergraph escaping": the option
+    parser (\\ ' :) and then the filtergraph parser (\\ ' [ ] , ;).
+    Handles drive letters, quotes and commas in paths without chdir tricks.
+    """
+    for ch in "\\':":
+        value = value.replace(ch, "\\" + ch)
+    for ch in "\\'[],;":
+        value = value.replace(ch, "\\" + ch)
+    return value
+
+# "00".."FF", indexed by byte value
+_HEX_BYTE = [f"{i:02X}" for i in range(256)]
+
+@lru_cache(maxsize=256)
+def hex_to_ass(hex_color: str) -> str:
+    """Convert '#RRGGBB' to an ASS colour ('&H00BBGGRR'); white if malformed."""
+    c = hex_color.lstrip('#')
+    if len(c) == 6:
+        try:
+            val = int(c, 16)
+        except ValueError:
+            return "&H00FFFFFF"
+        return f"&H00{_HEX_BYTE[val & 0xFF]}{_HEX_BYTE[(val >> 8) & 0xFF]}{_HEX_BYTE[(val >> 16) & 0xFF]}"
+    return "&H00FFFFFF"
+
+def _ffmpeg_threads_per_job(cpu_cores: int, workers: int) -> int:
+    """
+    Thread budget for each parallel ffmpeg encode.
+    AUTOCLIP_FFMPEG_THREADS overrides the default even split of the cores.
+    """
+    override = os.environ.get("AUTOCLIP_FFMPEG_THREADS")
+    if override:
+        try:
+            return max(1, int(override))
+        except ValueError:
+            logger.warning(f"Ignoring invalid AUTOCLIP_FFMPEG_THREADS={override!r}")
+    return max(1, cpu_cores // workers)
+
 class AutoClipPipeline:
     def __init__(self, assets_dir: str, output_dir: str):
         self.assets_dir = assets_dir
         self.output_dir = output_dir
         self.matcher = Matcher(assets_dir)
+        # Ways the last run's output differs from its config (e.g. the fallback
+        # dropped the crossfade); shown to the user by the GUI
+        self.warnings: List[str] = []
 
     def run(self, config: MixConfig, progress_callback=None):
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.warnings = []
+        
+        # The pipeline may be reused across runs (cached by the GUI):
+        # rescan asset folders so newly added videos are picked up.
+        self.matcher.folder_states.clear()
         
         # CPU Optimization for Xeon/High-core CPUs
-        # Detected cores or default to 16 if retrieval fails
-        cpu_cores = os.cpu_count() or 16
-        # Limit threads to reasonable max for FFmpeg (usually diminishing returns > 32, but let's allow up to 32 or full usage)
-        # For Xeon, using all cores is generally desired.
+        # Count only the cores we are allowed to run on (containers, taskset)
+        cpu_cores = effective_cpu_count()
         # For Xeon, using all cores is generally desired.
-        render_threads = max(4, cpu_cores)
+        render_threads = cpu_cores
         logger.info(f"Multi-core Optimization: Using {render_threads} threads for encoding.")
         
         # Extract audio identifier
@@ -54,25 +201,37 @@ class AutoClipPipeline:
         # Determine SRT path
         srt_path = config.srt_path
         if not srt_path:
-            # Generate SRT
-            if progress_callback:
-                progress_callback(0.05, "Auto-generating Subtitles (FunASR)...")
-            
-            logger.info(f"ASR start for {config.audio_path}...")
             srt_name = f"generated_{timestamp}.srt"
             srt_path = os.path.join(batch_dir, srt_name)
-            generate_srt(config.audio_path, srt_path)
-            logger.info(f"ASR completed. Output: {srt_path}")
+            cache_path = _srt_cache_path(config.audio_path)
+            if os.path.exists(cache_path):
+                logger.info(f"Using cached subtitles for {config.audio_path}: {cache_path}")
+                shutil.copyfile(cache_path, srt_path)
+            else:
+                # Generate SRT
+                if progress_callback:
+                    progress_callback(0.05, "Auto-generating Subtitles (FunASR)...")
+                
+                logger.info(f"ASR start for {config.audio_path}...")
+                generate_srt(config.audio_path, srt_path)
+                logger.info(f"ASR completed. Output: {srt_path}")
+                try:
+                    os.makedirs(SRT_CACHE_DIR, exist_ok=True)
+                    # Copy then rename so a concurrent run never reads a half-written cache file
+                    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+                    shutil.copyfile(srt_path, tmp_path)
+                    os.replace(tmp_path, cache_path)
+                except OSError as e:
+                    logger.warning(f"Could not cache subtitles: {e}")
             
         # Load Audio
-        time.sleep(1) # Give system a moment
         if progress_callback:
             progress_callback(0.1, "Loading Assets...")
             
         logger.info(f"Validating Audio Duration: {config.audio_path}")
         try:
-            with AudioFileClip(config.audio_path) as temp_audio:
-                total_duration = temp_audio.duration
+            # One ffprobe call; every batch reuses this duration
+            total_duration = probe_duration(config.audio_path)
             logger.info(f"Audio duration: {total_duration}s")
         except Exception as e:
             logger.error(f"Error loading audio: {e}")
@@ -80,172 +239,190 @@ class AutoClipPipeline:
         
         # Load SRT
         logger.info(f"Loading SRT: {srt_path}")
-        subs = pysrt.open(srt_path)
-        logger.info(f"SRT loaded. {len(subs)} lines.")
+        # utf-8-sig: editors on Windows often save SRTs with a BOM
+        with open(srt_path, 'r', encoding='utf-8-sig') as f:
+            srt_text = f.read()
         
         # Old segments logic removed.
 
 
+        # 1. Plan Strategy (Timeline)
+        # Depends only on the config and audio length, so it is shared by every batch
+        # Allocation of time per folder based on weights
+        total_weight = sum(fw.weight for fw in config.folder_weights)
+
+        timeline_blocks = []
+        current_t = 0.0
+
+        for fw in config.folder_weights:
+            if total_weight > 0:
+                share = fw.weight / total_weight
+                duration_share = share * total_duration
+            else:
+                duration_share = 0
+
+            timeline_blocks.append({
+                "folder": os.path.join(self.assets_dir, "video", fw.folder),
+                "speed": fw.speed, # Pass speed config
+                "clip_min_duration": fw.clip_min_duration,
+                "clip_max_duration": fw.clip_max_duration,
+                "start": current_t,
+                "end": current_t + duration_share
+            })
+            current_t += duration_share
+
+        # Ensure last block covers floating point errors
+        if timeline_blocks:
+            timeline_blocks[-1]["end"] = max(total_duration, timeline_blocks[-1]["end"])
+
+        logger.info(f"Timeline planned with {len(timeline_blocks)} blocks.")
+
+        # --- START SUBTITLE PREPARATION (Common) ---
+        # Prepare subtitle filter args
+        # Use forward slashes and ensure absolute path for filter
+        srt_abspath = os.path.abspath(srt_path)
+
+        if not os.path.exists(srt_abspath):
+             logger.error(f"CRITICAL: SRT file does NOT exist at {srt_abspath}")
+
+        # Default to original
+        final_srt_path = srt_abspath
+
+        # Offset Logic
+        SHIFT_SECONDS = -0.5
+        try:
+            # Shift once per run, before any batch starts: batches may encode concurrently
+            shifted_srt_name = f"shifted_{os.path.basename(srt_path)}"
+            shifted_srt_path = os.path.join(batch_dir, shifted_srt_name)
+
+            shifted_text, cue_count = _shift_srt(srt_text, SHIFT_SECONDS)
+            logger.info(f"Applying {SHIFT_SECONDS}s shift to {cue_count} subtitle lines...")
+            with open(shifted_srt_path, 'w', encoding='utf-8') as f:
+                f.write(shifted_text)
+
+            final_srt_path = os.path.abspath(shifted_srt_path)
+        except Exception as e:
+            logger.error(f"Error shifting subtitles: {e}")
+
+        # Path formatting for FFmpeg 'subtitles' filter (ffmpeg takes forward slashes on Windows too)
+        srt_filter_path = final_srt_path.replace('\\', '/') if os.name == 'nt' else final_srt_path
+
+        # Subtitle Style
+        primary_color_ass = hex_to_ass(config.subtitle_color)
+
+        style_str = (
+            f"Fontname={config.subtitle_font_name},FontSize={config.subtitle_font_size},"
+            f"PrimaryColour={primary_color_ass},Outline={config.subtitle_outline},"
+            f"Shadow={config.subtitle_shadow},MarginV={config.subtitle_margin_v},"
+            f"Alignment=2,Bold={1 if config.subtitle_bold else 0}"
+        )
+
+        ffmpeg_sub_filter = f"subtitles=filename={_filter_escape(srt_filter_path)}:force_style={_filter_escape(style_str)}"
+        # --- END SUBTITLE PREPARATION ---
+
+
         generated_files = []
 
-        for i in range(config.batch_count):
-            # Reset used files for this new video to ensure it starts fresh
-            # But within this video, it will try not to reuse clips until exhausted.
-            self.matcher.reset_usage()
+        # Parallel Rendering Setup
+        # Optimization for High-Core CPUs (e.g., Xeon)
+        # - Use more workers, but limit threads per worker to avoid context switch overhead.
+        # Allow up to 16 workers if cores allow (preserving some for system)
+        MAX_WORKERS = max(2, min(16, cpu_cores // 2)) 
+        # Split the cores between workers so MAX_WORKERS x THREADS_PER_JOB never exceeds them
+        THREADS_PER_JOB = _ffmpeg_threads_per_job(cpu_cores, MAX_WORKERS)
+        
+        logger.info(f"Parallel Rendering: {MAX_WORKERS} workers, {THREADS_PER_JOB} threads/worker.")
+        
+        # Batch i's final encode overlaps batch i+1's chunk renders. Planning stays
+        # sequential: ordered streams continue from where the previous batch stopped.
+        final_workers = min(config.batch_count, MAX_CONCURRENT_FINALS)
+        # A lone final encode lets the encoder size its own thread pool (-threads 0);
+        # concurrent ones split the cores so they don't oversubscribe
+        final_threads = 0 if final_workers == 1 else max(1, render_threads // final_workers)
+        finish_futures = []
+        # Probe the final encoder here, once, rather than racing in the finish threads
+        logger.info(f"Final encoder: {get_h264_encoder()}")
+        
+        # Workers get plain job dicts (source paths + times), never live clips;
+        # "spawn" avoids forking the multi-threaded host (Streamlit) on every platform.
+        # One pool serves every batch, so worker start-up is paid once per run.
+        mp_context = multiprocessing.get_context("spawn")
+        with concurrent.futures.ProcessPoolExecutor(max_workers=MAX_WORKERS, mp_context=mp_context) as executor, \
+                concurrent.futures.ThreadPoolExecutor(max_workers=final_workers) as finisher:
+            for i in range(config.batch_count):
+                # Reset used files for this new video to ensure it starts fresh
+                # But within this video, it will try not to reuse clips until exhausted.
+                self.matcher.reset_usage()
 
-            logger.info(f"=== Starting Batch {i+1}/{config.batch_count} ===")
+                logger.info(f"=== Starting Batch {i+1}/{config.batch_count} ===")
             
-            # Reload audio for each batch to ensure fresh file handles
-            main_audio = AudioFileClip(config.audio_path)
-            
-            batch_metadata = []
-            if progress_callback:
-                progress_callback(0.2, f"Batch {i+1}: Planning Timeline...")
+                batch_metadata = []
+                if progress_callback:
+                    progress_callback(0.2, f"Batch {i+1}: Planning Timeline...")
 
-            # 1. Plan Strategy (Timeline)
-            # Allocation of time per folder based on weights
-            total_weight = sum(fw.weight for fw in config.folder_weights)
-            
-            timeline_blocks = []
-            current_t = 0.0
-            
-            for fw in config.folder_weights:
-                if total_weight > 0:
-                    share = fw.weight / total_weight
-                    duration_share = share * total_duration
-                else:
-                    duration_share = 0
-                
-                timeline_blocks.append({
-                    "folder": os.path.join(self.assets_dir, "video", fw.folder),
-                    "speed": fw.speed, # Pass speed config
-                    "clip_min_duration": fw.clip_min_duration,
-                    "clip_max_duration": fw.clip_max_duration,
-                    "start": current_t,
-                    "end": current_t + duration_share
-                })
-                current_t += duration_share
-            
-            # Ensure last block covers floating point errors
-            if timeline_blocks:
-                timeline_blocks[-1]["end"] = max(total_duration, timeline_blocks[-1]["end"])
-            
-            logger.info(f"Timeline planned with {len(timeline_blocks)} blocks.")
 
-            # 2. Assemble Video Tracks - RENDER CHUNKS IMMEDIATELY TO AVOID OOM
-            temp_parts_dir = os.path.join(batch_dir, "parts")
-            os.makedirs(temp_parts_dir, exist_ok=True)
+                # 2. Assemble Video Tracks - one ffmpeg-rendered part per chunk
+                # Per-batch parts dir: an earlier batch may still be reading its parts
+                temp_parts_dir = os.path.join(batch_dir, "parts", f"batch_{i+1}")
+                os.makedirs(temp_parts_dir, exist_ok=True)
             
-            part_files = []
+                part_files = []
             
-            # Create render tasks from timeline_blocks
-            # Subdivide blocks to avoid huge memory usage
-            MAX_CHUNK_DURATION = 15.0 
-            render_tasks = []
+                # Create render tasks from timeline_blocks
+                # Subdivide blocks so long blocks spread across the worker pool
+                # (each part is streamed by ffmpeg, so length is not a memory concern)
+                MAX_CHUNK_DURATION = 15.0 
+                render_tasks = []
             
-            for idx_b, block in enumerate(timeline_blocks):
-                b_start = block["start"]
-                b_end = block["end"]
-                folder = block["folder"]
-                speed = block.get("speed", 1.0)
+                for idx_b, block in enumerate(timeline_blocks):
+                    b_start = block["start"]
+                    b_end = block["end"]
+                    folder = block["folder"]
+                    speed = block.get("speed", 1.0)
                 
-                curr = b_start
-                while curr < b_end:
-                    next_t = min(curr + MAX_CHUNK_DURATION, b_end)
-                    
-                    is_block_start = (curr == b_start)
-                    is_block_end = (next_t == b_end)
-                    
-                    # Determine global index logic for transition eligibility
-                    # We only transition if it is a block boundary AND not the absolute start/end of video
-                    # However, since we process blocks in order, we can flag 'needs_trans_in' / 'needs_trans_out'
-                    
-                    # For Crossfade, we need overlaps between BLOCKS. 
-                    # Block N End overlaps with Block N+1 Start.
-                    
-                    task_info = {
-                        "start": curr,
-                        "end": next_t,
-                        "folder": folder,
-                        "speed": speed,
-                        "clip_min_duration": block.get("clip_min_duration", 0.0),
-                        "clip_max_duration": block.get("clip_max_duration", 0.0),
-                        "duration": next_t - curr,
-                        "is_block_start": is_block_start,
-                        "is_block_end": is_block_end,
-                        "block_index": idx_b,
-                        "total_blocks": len(timeline_blocks)
-                    }
-                    render_tasks.append(task_info)
-                    
-                    curr = next_t
+                    curr = b_start
+                    while curr < b_end:
+                        next_t = min(curr + MAX_CHUNK_DURATION, b_end)
+                    
+                        is_block_start = (curr == b_start)
+                        is_block_end = (next_t == b_end)
+                    
+                        # Determine global index logic for transition eligibility
+                        # We only transition if it is a block boundary AND not the absolute start/end of video
+                        # However, since we process blocks in order, we can flag 'needs_trans_in' / 'needs_trans_out'
+                    
+                        # For Crossfade, we need overlaps between BLOCKS. 
+                        # Block N End overlaps with Block N+1 Start.
+                    
+                        task_info = {
+                            "start": curr,
+                            "end": next_t,
+                            "folder": folder,
+                            "speed": speed,
+                            "clip_min_duration": block.get("clip_min_duration", 0.0),
+                            "clip_max_duration": block.get("clip_max_duration", 0.0),
+                            "duration": next_t - curr,
+                            "is_block_start": is_block_start,
+                            "is_block_end": is_block_end,
+                            "block_index": idx_b,
+                            "total_blocks": len(timeline_blocks)
+                        }
+                        render_tasks.append(task_info)
+                    
+                        curr = next_t
 
-            # Parallel Rendering Setup
-            import concurrent.futures
-            
-            # Optimization for High-Core CPUs (e.g., Xeon)
-            # - Use more workers, but limit threads per worker to avoid context switch overhead.
-            # Allow up to 16 workers if cores allow (preserving some for system)
-            MAX_WORKERS = max(2, min(16, cpu_cores // 2)) 
-            # Each worker gets remaining threads distributed, but capped at 4-6 is usually sweet spot for 1080p
-            THREADS_PER_JOB = max(2, min(8, int(cpu_cores / MAX_WORKERS)))
-            
-            logger.info(f"Parallel Rendering: {MAX_WORKERS} workers, {THREADS_PER_JOB} threads/worker.")
-            
-            def render_chunk_worker(idx, task, video_clip, output_path, threads_count):
-                """Worker function to render a single chunk."""
-                try:
-                    # Apply Fades (Stateful modification, must happen here or before)
-                    # Note: We passed the configured clip.
-                    
-                    # RENDER PART (VIDEO ONLY)
-                    logger.info(f"[Worker-{idx}] Rendering video part to {output_path}...")
-                    
-                    video_clip.write_videofile(
-                        output_path, 
-                        fps=24, 
-                        codec='libx264',
-                        audio=False, 
-                        preset='ultrafast',
-                        threads=threads_count, # Distributed threads
-                        logger=None
-                    )
-                    
-                    # Return metadata about the part
-                    return {
-                        "file": output_path,
-                        "pad_head": task.get("pad_head", 0.0),
-                        "pad_tail": task.get("pad_tail", 0.0),
-                        "is_block_start": task["is_block_start"],
-                        "block_index": task["block_index"],
-                        "chunk_index": idx
-                    }
-                except Exception as e:
-                    logger.error(f"[Worker-{idx}] Error: {e}")
-                    raise e
-                finally:
-                    # CLEANUP inside worker to ensure it closes after use
-                    try:
-                        video_clip.close()
-                    except: pass
-                    
-            
-            batch_start_time = time.time()
-            futures = []
-            
-            # We must maintain order of 'part_files' eventually, or sort them later.
-            # We also need to throttle creation of clips to avoid opening 1000 files.
-            
-            with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+                batch_start_time = time.time()
+                futures = []
+                # Worker results arrive in completion order; sorted by chunk_index afterwards
+                results = []
                 for idx, task in enumerate(render_tasks):
                     # Check existing futures
                     # If we have too many pending, wait for one to finish
                     while len(futures) >= MAX_WORKERS * 2: # buffer a bit
                         done, not_done = concurrent.futures.wait(futures, return_when=concurrent.futures.FIRST_COMPLETED)
-                        # Process done futures to catch errors early
+                        # Collect done futures (re-raises worker errors early)
                         for f in done:
-                            if f.exception():
-                                raise f.exception()
+                            results.append(f.result())
                         futures = list(not_done)
                     
                     current_time = time.time()
@@ -262,7 +439,6 @@ class AutoClipPipeline:
                     chunk_end = task["end"]
                     duration = task["duration"]
                     folder = task["folder"]
-                    speed_factor = task.get("speed", 1.0)
                     
                     # TRANSITION LOGIC
                     pad_head = 0.0
@@ -286,7 +462,6 @@ class AutoClipPipeline:
                     # The duration we NEED (in final video time)
                     needed_duration = duration + pad_head + pad_tail
                     
-                    # The duration we FETCH from source (raw time)
                     # The duration we FETCH from source (raw time)
                     # If speed is 2.0 (faster), we need 2x source material to fill the time.
                     # If speed is 0.5 (slower), we need 0.5x source material.
@@ -296,31 +471,26 @@ class AutoClipPipeline:
                     clip_min = task.get("clip_min_duration", 0.0)
                     clip_max = task.get("clip_max_duration", 0.0)
                     
-                    # Get Video Clip (Main Thread - SAFE)
-                    video_clip = None
+                    # Pick source segments (Main Thread: matcher state is sequential)
+                    segment_meta = []
                     try:
                         if folder:
                             # Decide between Random Cuts vs Ordered Stream
                             if clip_min > 0.1 and clip_max > clip_min:
                                 # Use Random Cuts
-                                # Note: get_random_cut_clip returns a concatenated clip of random parts
-                                video_clip, segment_meta = self.matcher.get_random_cut_clip(
+                                # Limits are visual: a 2s visual clip at 2x speed needs 4s of source,
+                                # so the source-time limits are scaled by the speed factor.
+                                segment_meta = self.matcher.get_random_cut_segments(
                                     folder, 
                                     fetch_duration_source, 
-                                    clip_min * speed_factor, # Scale limits to source time? No, usually limits are visual. 
-                                    # Wait. A 2s visual clip at 2x speed needs 4s source.
-                                    # So min_dur/max_dur should be SCALED if we apply speed AFTER.
-                                    # Actually get_random_cut_clip assembles SOURCE clips.
-                                    # If we want final visual clip to be 2-4s:
-                                    # Source clip needs to be 4-8s (at 2x speed).
-                                    # So we pass scaled limits.
+                                    clip_min * speed_factor,
                                     clip_max * speed_factor
                                 )
                             else:
                                 # Use Ordered Stream
-                                video_clip, segment_meta = self.matcher.get_ordered_clip(folder, fetch_duration_source)
+                                segment_meta = self.matcher.get_ordered_segments(folder, fetch_duration_source)
                             
-                            if video_clip:
+                            if segment_meta:
                                 batch_metadata.append({
                                     "chunk_index": idx,
                                     "timeline_start": chunk_start,
@@ -331,32 +501,35 @@ class AutoClipPipeline:
                                     "speed_factor": speed_factor
                                 })
                         
-                        if not video_clip:
+                        if not segment_meta:
                              logger.warning(f"No video found for chunk {idx}, using placeholder.")
-                             video_clip = ColorClip(size=(config.width, config.height), color=(0,0,0), duration=needed_duration)
-                        else:
-                            # Resize/Crop
-                            video_clip = self.matcher.resize_and_crop(video_clip, (config.width, config.height))
-                            
-                            # Apply Speed Effect if needed
-                            if abs(speed_factor - 1.0) > 0.01:
-                                video_clip = video_clip.fx(speedx, speed_factor)
-                        
-                        # Ensure exact duration (trim floating point errors or excess fetch)
-                        video_clip = video_clip.set_duration(needed_duration)
                         
-                        # Apply Fade Effects (CPU bound, fast)
+                        # Fade Effects (Fade to Black) are applied by the worker
+                        fade_in = fade_out = 0.0
                         if config.transition_type == "Fade to Black":
                              if task["is_block_start"] and task["block_index"] > 0:
-                                 video_clip = video_clip.fadein(trans_dur)
+                                 fade_in = trans_dur
                              if task["is_block_end"] and task["block_index"] < task["total_blocks"] - 1:
-                                 video_clip = video_clip.fadeout(trans_dur)
+                                 fade_out = trans_dur
                         
-                        part_file = os.path.join(temp_parts_dir, f"part_{idx:04d}.mp4")
+                        job = {
+                            "chunk_index": idx,
+                            "block_index": task["block_index"],
+                            "segments": segment_meta,
+                            "source_meta": [self.matcher.video_meta(seg["source_file"]) for seg in segment_meta],
+                            "size": (config.width, config.height),
+                            "speed": speed_factor if segment_meta else 1.0,
+                            "duration": needed_duration,
+                            "fade_in": fade_in,
+                            "fade_out": fade_out,
+                            "fps": PART_FPS,
+                            "threads": THREADS_PER_JOB,
+                            "ffmpeg_params": PART_FFMPEG_PARAMS,
+                            "output_path": os.path.join(temp_parts_dir, f"part_{idx:04d}.mp4"),
+                        }
                         
                         # Submit to Worker
-                        future = executor.submit(render_chunk_worker, idx, task, video_clip, part_file, THREADS_PER_JOB)
-                        futures.append(future)
+                        futures.append(executor.submit(render_part, job))
                         
                     except Exception as e:
                         logger.error(f"Error preparing chunk {idx}: {e}")
@@ -364,348 +537,271 @@ class AutoClipPipeline:
 
                 # Wait for all remaining
                 for f in concurrent.futures.as_completed(futures):
-                    res = f.result()
-                    # We can append here, but order might be scrambled.
-                    # We used 'idx' in filename so we can sort later or store in dict.
-                    pass
-            
-            logger.info("All chunks rendered. Collecting results...")
-            
-            # Reconstruct ordered list
-            # We can re-scan the dir or build from futures if we tracked them.
-            # Simpler: Scan dir based on known pattern.
-            part_files = []
-            for idx in range(len(render_tasks)):
-                 part_file = os.path.join(temp_parts_dir, f"part_{idx:04d}.mp4")
-                 # We need the metadata we computed (pad_head/tail).
-                 # We can re-compute or store it in a map 'chunk_meta_map'.
-                 # Actually, we can just grab it from 'render_tasks' using the modified task object?
-                 # No, 'render_tasks' was local.
-                 # Let's re-calculate logic briefly is safer or retrieve from where?
-                 # We modified 'task' dict in the loop. 'render_tasks' contains those modified dicts!
-                 t = render_tasks[idx] 
-                 part_files.append({
-                        "file": part_file,
-                        "pad_head": t.get("pad_head", 0.0),
-                        "pad_tail": t.get("pad_tail", 0.0),
-                        "is_block_start": t["is_block_start"],
-                        "block_index": t["block_index"]
-                 })
-                 
-            import gc
-            gc.collect()
-
-            # Concatenate Parts
-            if not part_files:
-                continue
-                
-            logger.info(f"All chunks rendered. Concatenating {len(part_files)} parts...")
-            
-            # Determine if we can use Fast Path (Direct FFmpeg Concat)
-            # We can use fast path if Config is NOT Crossfade.
-            # Fade to Black and None are baked into chunks, so linear concat works.
-            use_fast_path = (config.transition_type != "Crossfade")
-            
-            # --- START SUBTITLE PREPARATION (Common) ---
-            # Prepare subtitle filter args
-            # Use forward slashes and ensure absolute path for filter
-            srt_abspath = os.path.abspath(srt_path)
-            
-            if not os.path.exists(srt_abspath):
-                 logger.error(f"CRITICAL: SRT file does NOT exist at {srt_abspath}")
-            
-            # Default to original
-            final_srt_path = srt_abspath
-            
-            # Offset Logic
-            SHIFT_SECONDS = -0.5
-            try:
-                # Check if we already shifted? Only do it once or unique per batch?
-                # Ideally we do it once per run, but we are in a loop.
-                # To avoid re-shifting multiple times if we reused srt_path, 
-                # we should check if we already created a shifted file.
-                shifted_srt_name = f"shifted_{os.path.basename(srt_path)}"
-                shifted_srt_path = os.path.join(batch_dir, shifted_srt_name)
+                    results.append(f.result())
                 
-                if not os.path.exists(shifted_srt_path):
-                    logger.info(f"Applying {SHIFT_SECONDS}s shift to subtitles...")
-                    subs_obj = pysrt.open(srt_abspath)
-                    subs_obj.shift(seconds=SHIFT_SECONDS)
-                    subs_obj.save(shifted_srt_path, encoding='utf-8')
+                logger.info("All chunks rendered. Collecting results...")
+                part_files = sorted(results, key=lambda r: r["chunk_index"])
                 
-                final_srt_path = os.path.abspath(shifted_srt_path)
-            except Exception as e:
-                logger.error(f"Error shifting subtitles: {e}")
-
-            # Path formatting for FFmpeg 'subtitles' filter
-            srt_filter_path = final_srt_path.replace('\\', '/')
-            if os.name == 'nt':
-                srt_filter_path = srt_filter_path.replace(':', '\\:')
-            
-            # Subtitle Style
-            def hex_to_ass(hex_color):
-                c = hex_color.lstrip('#')
-                if len(c) == 6:
-                    r, g, b = c[0:2], c[2:4], c[4:6]
-                    return f"&H00{b}{g}{r}".upper()
-                return "&H00FFFFFF"
-
-            primary_color_ass = hex_to_ass(config.subtitle_color)
-            font_name_escaped = config.subtitle_font_name.replace(" ", r"\ ")
-            
-            style_str = (
-                f"Fontname={font_name_escaped},FontSize={config.subtitle_font_size},"
-                f"PrimaryColour={primary_color_ass},Outline={config.subtitle_outline},"
-                f"Shadow={config.subtitle_shadow},MarginV={config.subtitle_margin_v},"
-                f"Alignment=2,Bold={1 if config.subtitle_bold else 0}"
-            )
+                finish_args = (i, config, part_files, batch_metadata, batch_dir, temp_parts_dir,
+                               ffmpeg_sub_filter, final_srt_path, total_duration, final_threads)
+                if final_workers == 1:
+                    # Nothing to overlap with: finish here so the encode can report progress
+                    result_file = self._finish_batch(*finish_args, progress_callback)
+                    if result_file:
+                        generated_files.append(result_file)
+                else:
+                    # Encode in the background while the next batch renders.
+                    # No progress callback there: UI callbacks (Streamlit) must stay on this thread.
+                    finish_futures.append(finisher.submit(self._finish_batch, *finish_args))
             
-            ffmpeg_sub_filter = f"subtitles='{srt_filter_path}':force_style='{style_str}'"
-            # --- END SUBTITLE PREPARATION ---
+            for k, fut in enumerate(finish_futures):
+                if progress_callback:
+                    progress_callback(0.85 + 0.15 * k / len(finish_futures), f"Batch {k+1}: Encoding final video...")
+                result_file = fut.result()
+                if result_file:
+                    generated_files.append(result_file)
 
-            output_filename = os.path.join(batch_dir, f"batch_{i+1}.mp4")
-            logger.info(f"Saving Final Video to {output_filename}")
+        # Cleanup shared resources
+        try:
+            # Only succeeds once every batch's parts dir has been removed
+            os.rmdir(os.path.join(batch_dir, "parts"))
+        except OSError:
+            pass
 
+        return generated_files
 
-            if use_fast_path:
-                logger.info(">>> FAST PATH ACTIVATED: Using Direct FFmpeg Concatenation <<<")
-                
-                # 1. Generate Concat List
-                concat_list_path = os.path.join(batch_dir, f"concat_list_{i}.txt")
-                with open(concat_list_path, 'w', encoding='utf-8') as f:
-                    for p_info in part_files:
-                        # ffmpeg requires forward slashes and safe paths
-                        p_abs = os.path.abspath(p_info["file"]).replace('\\', '/')
-                        f.write(f"file '{p_abs}'\n")
-                
-                # 2. Prepare Audio (Mix in Python, export to temp)
-                # This ensures we get specific BGM looping and volume correct without complex ffmpeg filters
-                if progress_callback:
-                    progress_callback(0.85, f"Batch {i+1}: Mixing Audio...")
-                    
-                temp_audio_path = os.path.join(batch_dir, f"temp_audio_{i}.m4a")
-                
-                try:
-                    # Main Audio
-                    final_audio_clip = main_audio
-                    
-                    # Add BGM if needed
-                    if config.bgm_file:
-                        bgm_path = os.path.join(self.assets_dir, "bgm", config.bgm_file)
-                        if os.path.exists(bgm_path):
-                             from moviepy.audio.fx.all import audio_loop, volumex
-                             bgm_clip = AudioFileClip(bgm_path)
-                             # Calculate duration from parts
-                             total_vid_dur = sum(p["pad_head"] + p.get("duration",0) + p["pad_tail"] for p in render_tasks)
-                             # No, easier: Use main_audio duration
-                             target_dur = main_audio.duration
-                             bgm_clip = audio_loop(bgm_clip, duration=target_dur)
-                             bgm_clip = bgm_clip.fx(volumex, 0.3)
-                             final_audio_clip = CompositeAudioClip([main_audio, bgm_clip])
-                    
-                    # Write Temp Audio
-                    # Explicitly use 'aac' to avoid libfdk_aac dependency issues
-                    final_audio_clip.write_audiofile(temp_audio_path, logger=None, fps=44100, codec='aac')
-                    
-                    # 3. Run FFmpeg
-                    if progress_callback:
-                        progress_callback(0.95, f"Batch {i+1}: Final FFmpeg Encoding...")
-                    
-                    import subprocess
-                    
-                    # Check if text file exists
-                    if not os.path.exists(concat_list_path):
-                        raise RuntimeError("Concat list file missing!")
-
-                    cmd = [
-                        "ffmpeg", "-y",
-                        "-f", "concat",
-                        "-safe", "0",
-                        "-i", concat_list_path,
-                        "-i", temp_audio_path,
-                        "-vf", ffmpeg_sub_filter,
-                        "-c:v", "libx264",
-                        "-preset", "ultrafast",
-                        "-c:a", "aac",
-                        "-threads", str(render_threads),
-                        "-map", "0:v",
-                        "-map", "1:a",
-                        "-shortest", # Finish when shortest input ends (usually audio)
-                        output_filename
-                    ]
-                    
-                    logger.info(f"Running FFmpeg: {' '.join(cmd)}")
-                    
-                    # Run Command
-                    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-                    stdout, stderr = process.communicate()
-                    
-                    if process.returncode != 0:
-                        logger.error(f"FFmpeg Error: {stderr}")
-                        raise RuntimeError("FFmpeg encoding failed.")
-                    else:
-                        logger.info("FFmpeg Fast Path Complete.")
-                        generated_files.append(output_filename)
-                        
-                except Exception as e:
-                     logger.error(f"Fast Path Failed: {e}. Falling back to standard method.")
-                     use_fast_path = False
-                     # Fallback proceeds below...
+    def _finish_batch(self, i: int, config: MixConfig, part_files: List[dict], batch_metadata: List[dict],
+                      batch_dir: str, temp_parts_dir: str, ffmpeg_sub_filter: str, srt_file: str,
+                      total_duration: float, render_threads: int, progress_callback=None) -> Optional[str]:
+        """
+        Join one batch's rendered parts into batch_{i+1}.mp4 with audio and burned
+        subtitles, and save its metadata. Returns the video path, or None if the
+        batch produced nothing. Touches no matcher state, so it may run on a
+        background thread while the next batch is planned and rendered.
+        """
+        # Concatenate Parts
+        if not part_files:
+            return None
 
-            if not use_fast_path:
-                # --- STANDARD MOVIEPY PATH (Legacy/Complex) ---
-                logger.info("Using Standard MoviePy Assembly (Slow Path)...")
+        logger.info(f"All chunks rendered. Concatenating {len(part_files)} parts...")
 
-                # Load all parts
-                clip_objects = []
-                # ... (Existing logic for logical_blocks) ...
-                try:
-                    # 1. Load all physical file parts
-                    loaded_parts = []
-                    for idx, p_info in enumerate(part_files):
-                        c = VideoFileClip(p_info["file"])
-                        loaded_parts.append({
-                            "clip": c,
-                            "block_index": p_info["block_index"],
-                            "chunk_index": idx
-                        })
-                    
-                    # 2. Group parts into "Logical Blocks" (Scenes)
-                    logical_blocks = []
-                    current_group = []
-                    current_blk_idx = -1
-                    
-                    for item in loaded_parts:
-                        if item["block_index"] != current_blk_idx:
-                            if current_group:
-                                # Concat previous group into one Block Clip
-                                if len(current_group) == 1:
-                                    logical_blocks.append(current_group[0])
-                                else:
-                                    logical_blocks.append(concatenate_videoclips(current_group, method="compose"))
-                            
-                            current_group = []
-                            current_blk_idx = item["block_index"]
-                        
-                        current_group.append(item["clip"])
-                    
-                    # Append last group
-                    if current_group:
-                        if len(current_group) == 1:
-                            logical_blocks.append(current_group[0])
-                        else:
-                            logical_blocks.append(concatenate_videoclips(current_group, method="compose"))
-                            
-                    logger.info(f"Assembled {len(logical_blocks)} logical blocks (scenes).")
+        # FFmpeg path for every transition type:
+        # - None / Fade to Black: fades are baked into chunks, so the concat demuxer
+        #   joins the parts' packets as-is and the only encode is the final one
+        #   (needed anyway to burn subtitles).
+        # - Crossfade: each block's parts are stream-copied into one file and the
+        #   blocks are blended with xfade inside that same final encode.
+        use_crossfade = config.transition_type == "Crossfade" and part_files[-1]["block_index"] > 0
 
-                    # 3. Apply Transitions between Logical Blocks
-                    if config.transition_type == "Crossfade" and len(logical_blocks) > 1:
-                        logger.info(f"Applying CROSSFADE (Duration: {config.transition_duration}s)...")
-                        
-                        # We need to apply .crossfadein() to blocks 1..N
-                        processed_blocks = []
-                        # Keep first block as is
-                        processed_blocks.append(logical_blocks[0])
-                        
-                        for i in range(1, len(logical_blocks)):
-                            blk = logical_blocks[i]
-                            blk = blk.crossfadein(config.transition_duration)
-                            processed_blocks.append(blk)
-                        
-                        # Concat with overlap
-                        # padding should be negative duration
-                        final_video_visual = concatenate_videoclips(
-                            processed_blocks, 
-                            method="compose", 
-                            padding= -config.transition_duration
-                        )
-                    else:
-                        logger.info(f"Concatenating blocks linearly (Method: Chain). (Config Type: '{config.transition_type}')")
-                        final_video_visual = concatenate_videoclips(logical_blocks, method="chain")
-                    
-                    # Set Audio
-                    if progress_callback:
-                        progress_callback(0.85, f"Batch {i+1}: Assembling & syncing audio...")
-                    
-                    final_duration = main_audio.duration
-                    if final_video_visual.duration > final_duration + 1.0: # Allow slight slack
-                         logger.warning(f"Video ({final_video_visual.duration:.2f}s) > Audio ({final_duration:.2f}s). Clipping video.")
-                         final_video_visual = final_video_visual.subclip(0, final_duration)
-                    elif final_video_visual.duration < final_duration:
-                         logger.warning(f"Video ({final_video_visual.duration}s) < Audio ({final_duration}s). Padding video (or letting it hold).")
-                         final_video_visual = final_video_visual.set_duration(final_duration)
-                         
-                    final_video = final_video_visual.set_audio(main_audio)
-                    
-                    # Add BGM
-                    if config.bgm_file:
-                        bgm_path = os.path.join(self.assets_dir, "bgm", config.bgm_file)
-                        if os.path.exists(bgm_path):
-                            from moviepy.audio.fx.all import audio_loop, volumex
-                            bgm_clip = AudioFileClip(bgm_path)
-                            bgm_clip = audio_loop(bgm_clip, duration=final_video.duration)
-                            bgm_clip = bgm_clip.fx(volumex, 0.3)
-                            final_audio = CompositeAudioClip([final_video.audio, bgm_clip])
-                            final_video = final_video.set_audio(final_audio)
-
-                    logger.info("This step includes FFmpeg encoding and burning subtitles. Please wait...")
-
-                    if progress_callback:
-                        progress_callback(0.95, f"Batch {i+1}: Encoding final video (this may take a while)...")
-                    
-                    ffmpeg_params = [
-                        '-vf', 
-                        ffmpeg_sub_filter # Reusing the filter string prepared above
-                    ]
-                    logger.info(f"Final ffmpeg_params: {ffmpeg_params}")
-                    
-                    # Write file
-                    final_video.write_videofile(
-                        output_filename, 
-                        fps=24, 
-                        codec='libx264', 
-                        audio_codec='aac',
-                        threads=render_threads,
-                        preset='ultrafast',
-                        logger=None,
-                        ffmpeg_params=ffmpeg_params
+        output_filename = os.path.join(batch_dir, f"batch_{i+1}.mp4")
+        result_file = None
+        logger.info(f"Saving Final Video to {output_filename}")
+
+        logger.info(">>> FAST PATH ACTIVATED: Using Direct FFmpeg Concatenation <<<")
+
+        try:
+            if use_crossfade:
+                # 1. One stream-copied file per block (parts share identical encode params)
+                block_groups = {}
+                for p_info in part_files:
+                    block_groups.setdefault(p_info["block_index"], []).append(p_info["file"])
+
+                block_files = []
+                for b_idx, files in sorted(block_groups.items()):
+                    block_list = os.path.join(temp_parts_dir, f"block_{b_idx:03d}.txt")
+                    block_file = os.path.join(temp_parts_dir, f"block_{b_idx:03d}.mp4")
+                    _write_concat_list(block_list, files)
+                    _run_ffmpeg(["ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", block_list, "-c", "copy", block_file])
+                    block_files.append(block_file)
+
+                durations = [probe_duration(f) for f in block_files]
+                logger.info(f"Applying CROSSFADE (Duration: {config.transition_duration}s) across {len(block_files)} blocks...")
+
+                video_inputs = []
+                for f in block_files:
+                    video_inputs += ["-i", f]
+                video_graph = _xfade_filter(durations, config.transition_duration)
+                audio_index = len(block_files)
+            else:
+                # 1. Generate Concat List
+                concat_list_path = os.path.join(temp_parts_dir, "concat_list.txt")
+                _write_concat_list(concat_list_path, [p_info["file"] for p_info in part_files])
+                video_inputs = ["-f", "concat", "-safe", "0", "-i", concat_list_path]
+                video_graph = "[0:v]null[vx]"
+                audio_index = 1
+
+            # 2. Audio: voice track, plus BGM looped under it at 30% volume
+            audio_inputs = ["-i", config.audio_path]
+            audio_graph = f"[{audio_index}:a]anull[aout]"
+            if config.bgm_file:
+                bgm_path = os.path.join(self.assets_dir, "bgm", config.bgm_file)
+                if os.path.exists(bgm_path):
+                    audio_inputs += ["-stream_loop", "-1", "-i", bgm_path]
+                    # duration=first: the endlessly looped BGM stops with the voice;
+                    # normalize=0 keeps the voice at full level, like a plain sum
+                    audio_graph = (
+                        f"[{audio_index + 1}:a]volume=0.3[bgm];"
+                        f"[{audio_index}:a][bgm]amix=inputs=2:duration=first:normalize=0[aout]"
                     )
-                    logger.info(f"Video encoding finished: {output_filename}")
-                    generated_files.append(output_filename)
 
-                finally:
-                    # Close clips logic handled in global finally block usually, 
-                    # but here we should close local clips if we opened them in this block
-                    pass
-                
-                # --- END STANDARD PATH ---
+            # 3. Subtitles: burned in with libass, or muxed as a soft track (no rasterizing)
+            if config.burn_subtitles:
+                subtitle_graph = f"[vx]{ffmpeg_sub_filter}[vout]"
+                subtitle_inputs = []
+                subtitle_maps = []
+            else:
+                subtitle_graph = "[vx]null[vout]"
+                subtitle_inputs = ["-i", srt_file]
+                subtitle_index = audio_index + audio_inputs.count("-i")
+                subtitle_maps = ["-map", f"{subtitle_index}:s", "-c:s", "mov_text"]
+            
+            # 4. Run FFmpeg: video graph + subtitles + audio mix in one encode
+            if progress_callback:
+                progress_callback(0.85, f"Batch {i+1}: Encoding final video...")
 
-            # Save Metadata
-            meta_filename = output_filename.replace('.mp4', '_metadata.json')
-                
+            cmd = [
+                "ffmpeg", "-y",
+                *video_inputs,
+                *audio_inputs,
+                *subtitle_inputs,
+                "-filter_complex", f"{video_graph};{subtitle_graph};{audio_graph}",
+                # GPU encoder when one works (subtitles still render on CPU frames)
+                *h264_encode_args(preset=FINAL_PRESET),
+                "-c:a", "aac",
+                "-threads", str(render_threads),
+                "-map", "[vout]",
+                "-map", "[aout]",
+                *subtitle_maps,
+                "-t", f"{total_duration:.3f}",
+                # Finish when shortest input ends (usually audio). Not with a soft subtitle
+                # track: it ends at the last cue and would cut the video short (-t still caps it).
+                *(["-shortest"] if config.burn_subtitles else []),
+                output_filename
+            ]
 
+            def on_encode_progress(frac):
+                progress_callback(0.85 + 0.15 * frac, f"Batch {i+1}: Encoding final video... {frac:.0%}")
+
+            logger.info(f"Running FFmpeg: {' '.join(cmd)}")
+            _run_ffmpeg(cmd, total_duration, on_encode_progress if progress_callback else None)
+            logger.info("FFmpeg Fast Path Complete.")
+            result_file = output_filename
+
+        except Exception as e:
+            logger.error(f"Fast Path Failed: {e}. Falling back to standard method.")
+
+        if result_file is None:
+            # --- STANDARD MOVIEPY PATH (Fallback) ---
+            # Linear join only: transitions other than baked-in fades are dropped here
+            logger.info("Using Standard MoviePy Assembly (Slow Path)...")
+            if use_crossfade:
+                self.warnings.append(f"Batch {i+1}: the fallback encoder joined the blocks without the crossfade.")
+            # Soft subtitles: encode to a side file first, then copy-mux the SRT in
+            encode_target = output_filename if config.burn_subtitles else output_filename.replace('.mp4', '.nosubs.mp4')
+
+            clip_objects = []
+            main_audio = None
+            final_video = None
             try:
-                with open(meta_filename, 'w', encoding='utf-8') as f:
-                    json.dump(batch_metadata, f, indent=2, ensure_ascii=False)
-                logger.info(f"Metadata saved to {meta_filename}")
-            except Exception as e:
-                logger.error(f"Error saving metadata: {e}")
-                
+                main_audio = AudioFileClip(config.audio_path)
+                for p_info in part_files:
+                    clip_objects.append(VideoFileClip(p_info["file"]))
+
+                logger.info(f"Concatenating parts linearly (Method: Chain). (Config Type: '{config.transition_type}')")
+                final_video_visual = concatenate_videoclips(clip_objects, method="chain")
+
+                # Set Audio
+                if progress_callback:
+                    progress_callback(0.85, f"Batch {i+1}: Assembling & syncing audio...")
+
+                final_duration = total_duration
+                if final_video_visual.duration > final_duration + 1.0: # Allow slight slack
+                    logger.warning(f"Video ({final_video_visual.duration:.2f}s) > Audio ({final_duration:.2f}s). Clipping video.")
+                    final_video_visual = final_video_visual.subclip(0, final_duration)
+                # Parts add up to the audio length by construction: within a frame, leave the clip as is
+                elif final_video_visual.duration < final_duration - 1.0 / PART_FPS:
+                    logger.warning(f"Video ({final_video_visual.duration}s) < Audio ({final_duration}s). Padding video (or letting it hold).")
+                    final_video_visual = final_video_visual.set_duration(final_duration)
+
+                final_video = final_video_visual.set_audio(main_audio)
+
+                # Add BGM
+                if config.bgm_file:
+                    bgm_path = os.path.join(self.assets_dir, "bgm", config.bgm_file)
+                    if os.path.exists(bgm_path):
+                        from moviepy.audio.fx.all import audio_loop, volumex
+                        bgm_clip = AudioFileClip(bgm_path)
+                        bgm_clip = audio_loop(bgm_clip, duration=final_video.duration)
+                        bgm_clip = bgm_clip.fx(volumex, 0.3)
+                        final_audio = CompositeAudioClip([final_video.audio, bgm_clip])
+                        final_video = final_video.set_audio(final_audio)
+
+                logger.info("This step includes FFmpeg encoding and burning subtitles. Please wait...")
+
+                if progress_callback:
+                    progress_callback(0.95, f"Batch {i+1}: Encoding final video (this may take a while)...")
+
+                ffmpeg_params = [
+                    '-vf', 
+                    ffmpeg_sub_filter # Reusing the filter string prepared above
+                ]
+                if not config.burn_subtitles:
+                    ffmpeg_params = []
+                logger.info(f"Final ffmpeg_params: {ffmpeg_params}")
+
+                # Write file
+                final_video.write_videofile(
+                    encode_target, 
+                    fps=24, 
+                    codec='libx264', 
+                    audio_codec='aac',
+                    threads=render_threads,
+                    preset=FINAL_PRESET,
+                    logger=None,
+                    ffmpeg_params=ffmpeg_params
+                )
+                logger.info(f"Video encoding finished: {encode_target}")
+                result_file = encode_target
+
             finally:
-                # Close all clips
-                if 'final_clips' in locals():
-                    for c in final_clips:
-                        try: c.close()
-                        except: pass
-                if 'clip_objects' in locals() and clip_objects:
-                     for c in clip_objects:
-                        try: c.close() 
-                        except: pass
-                        
-                if 'final_video' in locals(): final_video.close()
-                if 'main_audio' in locals(): main_audio.close()
+                # Release the readers even if assembly or the encode failed
+                for c in clip_objects:
+                    try: c.close()
+                    except: pass
+                if final_video is not None: final_video.close()
+                if main_audio is not None: main_audio.close()
 
-        # Cleanup shared resources
+            if result_file and not config.burn_subtitles:
+                try:
+                    _run_ffmpeg([
+                        "ffmpeg", "-y", "-i", encode_target, "-i", srt_file,
+                        "-map", "0", "-map", "1:s", "-c", "copy", "-c:s", "mov_text",
+                        output_filename
+                    ])
+                    os.remove(encode_target)
+                    result_file = output_filename
+                except Exception as e:
+                    logger.error(f"Muxing soft subtitles failed: {e}")
+                    self.warnings.append(f"Batch {i+1}: subtitles could not be muxed; use {srt_file} alongside the video.")
 
+            # --- END STANDARD PATH ---
+
+        if result_file:
+            # The parts (and block files / concat lists) are only inputs to this encode:
+            # free the disk now instead of letting every batch's parts pile up.
+            # Kept on failure so the parts can be inspected.
+            shutil.rmtree(temp_parts_dir, ignore_errors=True)
+
+        # Save Metadata
+        meta_filename = output_filename.replace('.mp4', '_metadata.json')
+
+
+        try:
+            with open(meta_filename, 'w', encoding='utf-8') as f:
+                json.dump(batch_metadata, f, indent=2, ensure_ascii=False)
+            logger.info(f"Metadata saved to {meta_filename}")
+        except Exception as e:
+            logger.error(f"Error saving metadata: {e}")
+
+        return result_file
 
-        return generated_files
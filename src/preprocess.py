@@ -5,7 +5,14 @@ from pathlib import Path
 import time
 from datetime import datetime
 import concurrent.futures
-import multiprocessing
+import sys
+
+if __package__ in (None, ""):
+    # Run as a script (python src/preprocess.py): make the repo root importable for src.*
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils import effective_cpu_count, h264_encode_args
+from src.preprocessor import get_video_info
 
 def check_ffmpeg():
     try:
@@ -25,33 +32,16 @@ def get_video_files(directory):
 
 import shutil
 
-def get_video_size(input_path):
-    """Returns (width, height) or None if failed."""
-    try:
-        cmd = [
-            "ffprobe", 
-            "-v", "error", 
-            "-select_streams", "v:0", 
-            "-show_entries", "stream=width,height", 
-            "-of", "csv=s=x:p=0", 
-            input_path
-        ]
-        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True, text=True)
-        w_str, h_str = result.stdout.strip().split('x')
-        return int(w_str), int(h_str)
-    except Exception:
-        return None
-
-def process_video(input_path, output_path, target_width=1080, target_height=1920):
+def process_video(input_path, output_path, target_width=1080, target_height=1920, encode_args=None):
     # Ensure output directory exists
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     
-    # Check current resolution
-    current_size = get_video_size(input_path)
-    if current_size:
-        cw, ch = current_size
-        if cw == target_width and ch == target_height:
-            print(f"[Info] {os.path.basename(input_path)} already matches target {target_width}x{target_height}. Skipping re-encode.")
+    # Check current resolution and codec (same rule as src.preprocessor)
+    info = get_video_info(input_path)
+    if info:
+        cw, ch, codec = info
+        if cw == target_width and ch == target_height and codec == "h264":
+            print(f"[Info] {os.path.basename(input_path)} already matches target {target_width}x{target_height} (h264). Skipping re-encode.")
             
             # If input and output are different files, copy instead of re-encoding
             if os.path.normpath(os.path.abspath(input_path)) != os.path.normpath(os.path.abspath(output_path)):
@@ -73,9 +63,7 @@ def process_video(input_path, output_path, target_width=1080, target_height=1920
         "-y",
         "-i", input_path,
         "-vf", f"scale={target_width}:{target_height}:force_original_aspect_ratio=decrease,pad={target_width}:{target_height}:(ow-iw)/2:(oh-ih)/2",
-        "-c:v", "libx264",
-        "-preset", "faster", 
-        "-crf", "23",
+        *(encode_args or h264_encode_args(preset="faster", crf=23)),
         "-c:a", "aac",
         "-b:a", "192k",
         "-movflags", "+faststart",
@@ -94,13 +82,13 @@ def process_video(input_path, output_path, target_width=1080, target_height=1920
         # print(e.stderr.decode()) # Optional: print error details
         return False
 
-def process_video_task(args):
+def process_video_task(args, encode_args=None):
     """
     Helper function for parallel processing to unpack arguments.
     args: (input_path, output_path, target_width, target_height)
     """
     input_path, output_path, target_width, target_height = args
-    return input_path, process_video(input_path, output_path, target_width, target_height)
+    return input_path, process_video(input_path, output_path, target_width, target_height, encode_args)
 
 def batch_process_parallel(files_tasks, max_workers=None, progress_callback=None):
     """
@@ -111,26 +99,29 @@ def batch_process_parallel(files_tasks, max_workers=None, progress_callback=None
         # Default to fewer workers if not specified to avoid choking I/O
         # A conservative default: CPU count / 2, capped at 8 to prevent disk IO saturation
         try:
-            cpu_count = os.cpu_count() or 4
+            cpu_count = effective_cpu_count()
             max_workers = max(1, min(cpu_count, 8)) 
         except:
             max_workers = 4
             
-    results = []
+    # Results are returned in task order (not completion order) so callers can zip them with files_tasks
+    results = [False] * len(files_tasks)
     total = len(files_tasks)
     
+    # Probe the encoder once here rather than once per worker process
+    encode_args = h264_encode_args(preset="faster", crf=23)
+    
     with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
         # Submit all tasks
-        future_to_file = {executor.submit(process_video_task, task): task[0] for task in files_tasks}
+        future_to_index = {executor.submit(process_video_task, task, encode_args): idx for idx, task in enumerate(files_tasks)}
         
-        for i, future in enumerate(concurrent.futures.as_completed(future_to_file)):
-            input_file = future_to_file[future]
+        for i, future in enumerate(concurrent.futures.as_completed(future_to_index)):
+            idx = future_to_index[future]
             try:
                 _, success = future.result()
-                results.append(success)
+                results[idx] = success
             except Exception as e:
-                print(f"[Error] Task failed for {input_file}: {e}")
-                results.append(False)
+                print(f"[Error] Task failed for {files_tasks[idx][0]}: {e}")
             
             if progress_callback:
                 progress_callback(i + 1, total)
@@ -2,27 +2,27 @@ import os
 import subprocess
 import json
 import concurrent.futures
-import multiprocessing
 import shutil
+from src.utils import effective_cpu_count, h264_encode_args
 
 def get_video_info(file_path):
     """
-    Get video width and height using ffprobe.
-    Returns: (width, height)
+    Get video width, height and codec using ffprobe.
+    Returns: (width, height, codec_name)
     """
     try:
         cmd = [
             "ffprobe", 
             "-v", "error", 
             "-select_streams", "v:0", 
-            "-show_entries", "stream=width,height", 
+            "-show_entries", "stream=width,height,codec_name", 
             "-of", "json", 
             file_path
         ]
         result = subprocess.run(cmd, capture_output=True, text=True, check=True)
         data = json.loads(result.stdout)
         stream = data["streams"][0]
-        return int(stream["width"]), int(stream["height"])
+        return int(stream["width"]), int(stream["height"]), stream.get("codec_name", "")
     except Exception as e:
         print(f"Error reading info for {file_path}: {e}")
         return None
@@ -30,10 +30,11 @@ def get_video_info(file_path):
 def process_single_video_task(args):
     """
     Worker task for processing a single video using FFmpeg directly.
-    args: (v_path, target_res)
+    args: (v_path, target_res, encode_args)
     Returns: (success_bool, v_path_or_error_msg)
+    Files already at target_res and encoded as H.264 are left untouched.
     """
-    v_path, target_res = args
+    v_path, target_res, encode_args = args
     temp_path = v_path + ".temp.mp4"
     
     try:
@@ -42,11 +43,11 @@ def process_single_video_task(args):
         if not info:
             return False, f"{v_path}: Could not read metadata"
             
-        w, h = info
+        w, h, codec = info
         tw, th = target_res
         
-        # Skip if already correct dimensions
-        if w == tw and h == th:
+        # Skip if already correct dimensions and codec (no decode/encode pass)
+        if w == tw and h == th and codec == "h264":
             return True, None # Skipped/Success
         
         # 2. Construct FFmpeg command
@@ -75,9 +76,7 @@ def process_single_video_task(args):
             "-y",                # Overwrite output
             "-i", v_path,
             "-vf", vf_filter,
-            "-c:v", "libx264",
-            "-preset", "ultrafast",   # Speed priority
-            "-crf", "23",
+            *encode_args,             # Speed priority (GPU encoder if available)
             "-c:a", "aac",            # Encode audio
             "-b:a", "128k",
             "-threads", "2",          # Limit threads per process to allow higher parallelism
@@ -135,7 +134,7 @@ def preprocess_videos(assets_dir, target_res, progress_callback=None):
     # We can aim for roughly (Total Threads) concurrent FFmpegs, or slightly less for IO safety.
     # For a Xeon with say 48 threads, we can run 20-24 workers.
     
-    cpu_count = multiprocessing.cpu_count()
+    cpu_count = effective_cpu_count()
     
     # Strategy: Assign roughly 1 worker per 2 logical cores, assuming FFmpeg takes ~200% CPU.
     # Reserve slight overhead.
@@ -152,11 +151,14 @@ def preprocess_videos(assets_dir, target_res, progress_callback=None):
     if max_workers > 24:
         max_workers = 24
         
-    print(f"Starting preprocessing with {max_workers} concurrent FFmpeg workers...")
+    # Probe the encoder once here rather than once per worker process
+    encode_args = h264_encode_args(preset="ultrafast", crf=23)
+    
+    print(f"Starting preprocessing with {max_workers} concurrent FFmpeg workers ({encode_args[1]})...")
 
     with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
         # Submit all tasks
-        futures = {executor.submit(process_single_video_task, (f, target_res)): f for f in all_files}
+        futures = {executor.submit(process_single_video_task, (f, target_res, encode_args)): f for f in all_files}
         
         for i, future in enumerate(concurrent.futures.as_completed(futures)):
             result_success, result_data = future.result()
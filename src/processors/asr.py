@@ -1,7 +1,7 @@
 import os
 import math
 from datetime import datetime
-from funasr import AutoModel
+from src.utils import effective_cpu_count
 
 def format_time(ms):
     """Convert milliseconds to SRT timestamp format (HH:MM:SS,mmm)"""
@@ -18,6 +18,7 @@ def generate_srt(audio_file: str, output_srt: str) -> None:
     """
     import torch
     import os
+    from funasr import AutoModel
     
     device = "cuda" if torch.cuda.is_available() else "cpu"
     
@@ -25,7 +26,7 @@ def generate_srt(audio_file: str, output_srt: str) -> None:
     if device == "cpu":
         try:
             # Get core count (logical)
-            num_cores = os.cpu_count() or 4
+            num_cores = effective_cpu_count()
             # PyTorch often defaults to 1 or halves it on some systems. 
             # We explicitly maximize it for Xeon.
             # However, avoid excessive thread contention if cores > 32? 
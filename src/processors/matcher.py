@@ -1,9 +1,8 @@
 import random
 import os
 from typing import List, Dict, Optional
-from moviepy.editor import VideoFileClip, vfx, concatenate_videoclips
 from src.models import FolderWeight
-from src.utils import get_video_files
+from src.utils import get_video_files, probe_video
 from src.logger import setup_logger
 
 logger = setup_logger("Matcher")
@@ -15,12 +14,46 @@ class Matcher:
         self.folder_states = {}
         # Track used files for unique selection within a session
         self.used_files = set()
+        # ((folder, weight) signature, [(folder_path, 1/weight), ...]) for weighted_route;
+        # only the current weights are kept, so the cache never grows
+        self._route_cache = (None, [])
+        # (path, mtime_ns, size) -> {duration, width, height, fps} (ffprobe), so planning
+        # never opens a clip; a file replaced in place gets a new key and is re-probed
+        self._video_meta = {}
 
     def reset_usage(self):
         """Reset the history of used files. Call this at the start of a new video."""
         logger.info(f"Resetting usage history. Previously used {len(self.used_files)} unique files.")
         self.used_files.clear()
 
+    def _route_table(self, folder_weights: List[FolderWeight]):
+        signature = tuple((fw.folder, fw.weight) for fw in folder_weights)
+        cached_signature, table = self._route_cache
+        if signature != cached_signature:
+            # Zero/negative weights can never be picked, so drop them up front
+            table = [
+                (os.path.join(self.assets_dir, "video", folder), 1.0 / weight)
+                for folder, weight in signature
+                if weight > 0
+            ]
+            self._route_cache = (signature, table)
+        return table
+
+    def weighted_route(self, folder_weights: List[FolderWeight]) -> Optional[str]:
+        """
+        Pick one folder path with probability weight / total_weight.
+        Uses A-Res keyed sampling (key = u ** (1 / w), keep the max) so each
+        pick is a single pass with no cumulative-weight array.
+        """
+        best_key = -1.0
+        best_path = None
+        for folder_path, inv_weight in self._route_table(folder_weights):
+            key = random.random() ** inv_weight
+            if key > best_key:
+                best_key = key
+                best_path = folder_path
+        return best_path
+
     def _init_folder_state(self, folder_path: str):
         if folder_path not in self.folder_states:
             videos = sorted(get_video_files(folder_path)) # Sort by name
@@ -31,19 +64,44 @@ class Matcher:
                 'current_time': 0.0
             }
 
-    def get_ordered_clip(self, folder_path: str, target_duration: float):
+    def pick_video(self, folder_path: str) -> Optional[str]:
+        """
+        Pick a random video file from the folder, or None if it has no videos.
+        """
+        try:
+            self._init_folder_state(folder_path)
+        except OSError as e:
+            logger.error(f"Cannot list folder {folder_path}: {e}")
+            return None
+        videos = self.folder_states[folder_path]['videos']
+        if not videos:
+            return None
+        return random.choice(videos)
+
+    def video_meta(self, video_path: str) -> dict:
+        """Source duration/width/height/fps, probed once per file version."""
+        st = os.stat(video_path)
+        key = (video_path, st.st_mtime_ns, st.st_size)
+        if key not in self._video_meta:
+            self._video_meta[key] = probe_video(video_path)
+        return self._video_meta[key]
+
+    def _duration(self, video_path: str) -> float:
+        return self.video_meta(video_path)["duration"]
+
+    def get_ordered_segments(self, folder_path: str, target_duration: float) -> List[dict]:
         """
-        Get the next chunk of video from the folder's sequence.
+        Plan the next chunk of video from the folder's sequence.
         Seamlessly transitions to the next video if the current one ends.
+        Returns segment dicts (source_file/source_start/source_end/duration); no clip is opened.
         """
         self._init_folder_state(folder_path)
         state = self.folder_states[folder_path]
         videos = state['videos']
         
         if not videos:
-            return None
+            return []
 
-        clips_to_concat = []
         segments_used = []
         remaining_duration = target_duration
 
@@ -54,12 +112,7 @@ class Matcher:
         while remaining_duration > 0 and loop_guard < max_loops:
             video_path = videos[state['current_vid_idx']]
             try:
-                # Load clip efficiently? Warning: VideoFileClip can be slow if opened repeatedly
-                # But we need duration.
-                logger.info(f"Loading source video: {os.path.basename(video_path)} (Idx: {state['current_vid_idx']})")
-                # In a persistent app, we might cache these objects, but here we just open/close.
-                full_clip = VideoFileClip(video_path)
-                video_len = full_clip.duration
+                video_len = self._duration(video_path)
                 
                 start_t = state['current_time']
                 
@@ -72,15 +125,11 @@ class Matcher:
                     logger.info("Video finished (Exact/Over). Moving to next.")
                     state['current_vid_idx'] = (state['current_vid_idx'] + 1) % len(videos)
                     state['current_time'] = 0.0
-                    full_clip.close() 
                     loop_guard += 1
                     continue
                 
                 take_time = min(available_time, remaining_duration)
                 
-                sub = full_clip.subclip(start_t, start_t + take_time)
-                clips_to_concat.append(sub)
-                
                 segments_used.append({
                     "source_file": video_path,
                     "source_start": start_t,
@@ -88,7 +137,7 @@ class Matcher:
                     "duration": take_time
                 })
                 
-                logger.info(f"Selected segment: {take_time:.2f}s from {start_t:.2f}s to {start_t + take_time:.2f}s")
+                logger.info(f"Selected segment: {os.path.basename(video_path)} {take_time:.2f}s from {start_t:.2f}s to {start_t + take_time:.2f}s")
                 
                 # Update State
                 state['current_time'] += take_time
@@ -107,18 +156,12 @@ class Matcher:
             
             loop_guard += 1
 
-        if not clips_to_concat:
-            return None, []
-            
-        if len(clips_to_concat) == 1:
-            return clips_to_concat[0], segments_used
-        else:
-            return concatenate_videoclips(clips_to_concat), segments_used
+        return segments_used
 
-    def get_random_cut_clip(self, folder_path: str, target_total_duration: float, min_dur: float, max_dur: float):
+    def get_random_cut_segments(self, folder_path: str, target_total_duration: float, min_dur: float, max_dur: float) -> List[dict]:
         """
-        Randomly select multiple clips from folder to fill target_total_duration.
-        Each clip length is between min_dur and max_dur.
+        Randomly select multiple segments from folder to fill target_total_duration.
+        Each segment length is between min_dur and max_dur.
         Maintains internal `used_files` state to avoid repetition until exhausted.
         """
         self._init_folder_state(folder_path) # Just to load list
@@ -126,16 +169,11 @@ class Matcher:
         videos = state['videos']
         
         if not videos:
-            return None, []
+            return []
             
-        clips_to_concat = []
         segments_used = []
         current_len = 0.0
         
-        # Local cache to prevent opening the same file multiple times (OOM prevention)
-        # path -> VideoFileClip
-        local_clip_cache = {}
-        
         # Max retries to prevent infinite loop
         safety_break = 0
 
@@ -166,15 +204,7 @@ class Matcher:
             # ------------------------------
             
             try:
-                # CACHING LOGIC
-                if vid_path in local_clip_cache:
-                    temp_clip = local_clip_cache[vid_path]
-                else:
-                    # Open and cache
-                    temp_clip = VideoFileClip(vid_path)
-                    local_clip_cache[vid_path] = temp_clip
-                
-                vid_len = temp_clip.duration
+                vid_len = self._duration(vid_path)
                 
                 if vid_len < this_dur:
                     # If video is too short, we skip it or take all
@@ -186,16 +216,12 @@ class Matcher:
                     # just take the whole video instead of skipping.
                     # This is crucial for high-speed clips (e.g. 3.0x) where required source duration is long.
                     start_t = 0.0
-                    sub = temp_clip.subclip(0, vid_len)
                     actual_dur = vid_len
                 else:
                     max_start = vid_len - this_dur
                     start_t = random.uniform(0, max_start)
-                    
-                    sub = temp_clip.subclip(start_t, start_t + this_dur)
                     actual_dur = this_dur
                 
-                clips_to_concat.append(sub)
                 segments_used.append({
                     "source_file": vid_path,
                     "source_start": start_t,
@@ -214,43 +240,4 @@ class Matcher:
                 logger.error(f"Error reading {vid_path}: {e}")
                 safety_break += 1
         
-        if not clips_to_concat:
-            # Clean up cache if failed
-            for c in local_clip_cache.values():
-                try: c.close()
-                except: pass
-            return None, []
-            
-        if len(clips_to_concat) == 1:
-            res_clip = clips_to_concat[0]
-            res_clip.sources_cache = local_clip_cache # Hack to keep RefCount > 0
-            return res_clip, segments_used
-        else:
-            final_clip = concatenate_videoclips(clips_to_concat, method="compose")
-            final_clip.sources_cache = local_clip_cache # Keep masters alive
-            return final_clip, segments_used
-
-    def resize_and_crop(self, clip: VideoFileClip, target_size: tuple) -> VideoFileClip:
-        """
-        Resize and center crop the clip to fill target_size.
-        Uses scalar scaling to strictly preserve aspect ratio.
-        """
-        w, h = clip.size
-        target_w, target_h = target_size
-        
-        # Optimization: Skip if dimensions exactly match
-        if w == target_w and h == target_h:
-            return clip
-        
-        # Calculate scale factor needed to cover the target area
-        scale_factor = max(target_w / w, target_h / h)
-        
-        # Resize using a single scalar to strictly preserve aspect ratio
-        # print(f"[{datetime.now()}] [Matcher] Resizing clip from {w}x{h} to target {target_w}x{target_h} (Scale: {scale_factor:.4f})")
-        clip = clip.resize(scale_factor)
-            
-        # Center crop
-        # Note: clip.w and clip.h are updated after resize
-        clip = clip.crop(width=target_w, height=target_h, x_center=clip.w/2, y_center=clip.h/2)
-        
-        return clip
+        return segments_used
@@ -0,0 +1,86 @@
+import subprocess
+from typing import List
+from src.logger import setup_logger
+
+logger = setup_logger("Renderer")
+
+def _part_command(job: dict) -> List[str]:
+    """
+    Build the ffmpeg command for one chunk: every source segment is its own
+    seeked input, and scaling, joining, speed and fades all happen in one
+    filtergraph, so no frame passes through Python.
+    """
+    w, h = job["size"]
+    fps = job["fps"]
+    duration = job["duration"]
+    threads = str(job["threads"])
+
+    cmd = ["ffmpeg", "-y", "-hide_banner", "-loglevel", "error"]
+    graph = []
+    if job["segments"]:
+        labels = []
+        for k, seg in enumerate(job["segments"]):
+            cmd += [
+                "-threads", threads,
+                "-ss", f"{seg['source_start']:.3f}",
+                "-t", f"{seg['source_end'] - seg['source_start']:.3f}",
+                "-i", seg["source_file"],
+            ]
+            meta = job["source_meta"][k]
+            if (meta["width"], meta["height"]) == (w, h):
+                # Already the target size (e.g. preprocessed assets): skip libswscale
+                graph.append(f"[{k}:v]setsar=1[s{k}]")
+            else:
+                # Cover-scale then center crop: preserves aspect ratio and fills the frame
+                graph.append(
+                    f"[{k}:v]scale={w}:{h}:force_original_aspect_ratio=increase,"
+                    f"crop={w}:{h},setsar=1[s{k}]"
+                )
+            labels.append(f"[s{k}]")
+        chain = [f"{''.join(labels)}concat=n={len(labels)}:v=1:a=0"]
+        # Sources already at the part rate and played at 1x keep their timing: no retiming
+        # (input seeking starts each segment at 0, and concat keeps the common frame rate)
+        if job["speed"] != 1.0 or any(abs(meta["fps"] - fps) > 0.01 for meta in job["source_meta"]):
+            chain += [
+                f"setpts=(PTS-STARTPTS)/{job['speed']:.6f}",
+                f"fps={fps}",
+            ]
+        # Hold the last frame if the sources run a little short
+        chain.append(f"tpad=stop_mode=clone:stop_duration={duration:.3f}")
+    else:
+        cmd += ["-f", "lavfi", "-i", f"color=c=black:s={w}x{h}:r={fps}:d={duration:.3f}"]
+        chain = ["[0:v]null"]
+
+    if job["fade_in"]:
+        chain.append(f"fade=t=in:st=0:d={job['fade_in']:.3f}")
+    if job["fade_out"]:
+        chain.append(f"fade=t=out:st={max(0.0, duration - job['fade_out']):.3f}:d={job['fade_out']:.3f}")
+    graph.append(",".join(chain) + "[out]")
+
+    cmd += [
+        "-filter_complex", ";".join(graph),
+        "-map", "[out]", "-an",
+        "-t", f"{duration:.3f}",
+        "-c:v", "libx264", "-preset", "ultrafast",
+        *job["ffmpeg_params"],
+        "-threads", threads,
+        job["output_path"],
+    ]
+    return cmd
+
+def render_part(job: dict) -> dict:
+    """
+    Render one timeline chunk to job["output_path"] (video only).
+    Runs in a worker process; `job` holds only plain data (source segments,
+    size, speed, fades, encode settings).
+    """
+    idx = job["chunk_index"]
+    if not job["segments"]:
+        logger.warning(f"[Worker-{idx}] No video found, using placeholder.")
+    logger.info(f"[Worker-{idx}] Rendering video part to {job['output_path']}...")
+
+    result = subprocess.run(_part_command(job), stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    if result.returncode != 0:
+        logger.error(f"[Worker-{idx}] FFmpeg Error: {result.stderr}")
+        raise RuntimeError(f"Rendering part {idx} failed.")
+    return {"file": job["output_path"], "chunk_index": idx, "block_index": job["block_index"]}
@@ -1,6 +1,12 @@
 import re
 import os
-from typing import List
+import json
+import subprocess
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+# Hardware encoders in order of preference; libx264 is the universal fallback
+HW_H264_ENCODERS = ("h264_nvenc", "h264_qsv", "h264_videotoolbox", "h264_amf")
 
 def split_text(text: str) -> List[str]:
     """
@@ -17,19 +23,57 @@ def split_text(text: str) -> List[str]:
     parts = re.split(r'[。！？\n]', text)
     return [p.strip() for p in parts if p.strip()]
 
+# Lowercase suffixes; names are matched case-insensitively (.mp4, .MP4, .Mp4)
+VIDEO_EXTENSIONS = frozenset((
+    '.mp4', '.mov', '.avi', '.mkv', '.flv', '.wmv', 
+    '.webm', '.m4v', '.mpg', '.mpeg', '.3gp', '.ts', '.mts'
+))
+AUDIO_EXTENSIONS = frozenset(('.mp3', '.wav', '.m4a'))
+
+def _has_extension(name: str, extensions: frozenset) -> bool:
+    return os.path.splitext(name)[1].lower() in extensions
+
+def _scan_dir(path: str, suffixes: Optional[frozenset] = None, dirs: bool = False) -> List[os.DirEntry]:
+    """
+    Single os.scandir pass over `path`.
+    DirEntry caches the entry type, so there is no extra stat() per entry.
+    Returns subdirectories if dirs=True, otherwise files (with an extension in `suffixes` if given).
+    """
+    with os.scandir(path) as it:
+        if dirs:
+            return [e for e in it if e.is_dir()]
+        return [
+            e for e in it
+            if e.is_file() and (suffixes is None or _has_extension(e.name, suffixes))
+        ]
+
 def get_video_files(folder_path: str) -> List[str]:
     """
-    Get all .mp4 files in a directory.
+    Get all video file paths in a directory.
     """
-    video_extensions = (
-        '.mp4', '.mov', '.avi', '.mkv', '.flv', '.wmv', 
-        '.webm', '.m4v', '.mpg', '.mpeg', '.3gp', '.ts', '.mts'
-    )
-    return [
-        os.path.join(folder_path, f) 
-        for f in os.listdir(folder_path) 
-        if f.lower().endswith(video_extensions)
-    ]
+    return [e.path for e in _scan_dir(folder_path, VIDEO_EXTENSIONS)]
+
+def get_audio_files(folder_path: str) -> List[str]:
+    """
+    Get the names (not paths) of all audio files in a directory, sorted.
+    """
+    if not os.path.isdir(folder_path):
+        return []
+    return sorted(e.name for e in _scan_dir(folder_path, AUDIO_EXTENSIONS))
+
+def has_video_file(folder_path: str) -> bool:
+    """
+    Check whether a directory contains at least one video file.
+    Stops at the first match instead of listing the whole folder.
+    """
+    try:
+        with os.scandir(folder_path) as it:
+            for entry in it:
+                if entry.is_file() and _has_extension(entry.name, VIDEO_EXTENSIONS):
+                    return True
+    except OSError:
+        return False
+    return False
 
 def get_subfolders(base_path: str) -> List[str]:
     """
@@ -37,7 +81,98 @@ def get_subfolders(base_path: str) -> List[str]:
     """
     if not os.path.exists(base_path):
         return []
-    return [
-        f for f in os.listdir(base_path) 
-        if os.path.isdir(os.path.join(base_path, f))
+    return [e.name for e in _scan_dir(base_path, dirs=True)]
+
+def effective_cpu_count() -> int:
+    """
+    CPUs this process may actually run on. Under taskset/cgroup cpusets this
+    is fewer than os.cpu_count(), which reports every core on the host.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 4
+
+def _encoder_works(encoder: str) -> bool:
+    """
+    Encode a single tiny frame to check the encoder is usable on this machine.
+    Being listed in `ffmpeg -encoders` does not mean the GPU/driver is present.
+    """
+    cmd = [
+        "ffmpeg", "-hide_banner", "-loglevel", "error",
+        "-f", "lavfi", "-i", "color=c=black:s=256x256:d=0.1",
+        "-frames:v", "1", "-c:v", encoder, "-f", "null", "-"
     ]
+    try:
+        return subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=15).returncode == 0
+    except (OSError, subprocess.SubprocessError):
+        return False
+
+@lru_cache(maxsize=1)
+def get_h264_encoder() -> str:
+    """
+    Return the fastest working H.264 encoder, probed once per process.
+    Set AUTOCLIP_ENCODER (e.g. "libx264") to skip the probe.
+    """
+    override = os.environ.get("AUTOCLIP_ENCODER")
+    if override:
+        return override
+    try:
+        listing = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-encoders"],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, timeout=15
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return "libx264"
+    for encoder in HW_H264_ENCODERS:
+        if f" {encoder} " in listing and _encoder_works(encoder):
+            return encoder
+    return "libx264"
+
+def h264_encode_args(preset: str = "ultrafast", crf: int = 23) -> List[str]:
+    """
+    FFmpeg video codec arguments for get_h264_encoder().
+    preset/crf are libx264 terms; hardware encoders get their closest equivalent.
+    """
+    encoder = get_h264_encoder()
+    if encoder == "h264_nvenc":
+        return ["-c:v", encoder, "-preset", "p1", "-rc", "vbr", "-cq", str(crf)]
+    if encoder == "h264_qsv":
+        return ["-c:v", encoder, "-preset", "veryfast", "-global_quality", str(crf)]
+    if encoder == "h264_videotoolbox":
+        return ["-c:v", encoder, "-q:v", "65"]
+    if encoder == "h264_amf":
+        return ["-c:v", encoder, "-quality", "speed", "-rc", "cqp", "-qp_i", str(crf), "-qp_p", str(crf)]
+    return ["-c:v", encoder, "-preset", preset, "-crf", str(crf)]
+
+def probe_video(path: str) -> dict:
+    """
+    Duration (seconds), width, height and frame rate of a video file,
+    read with a single ffprobe call.
+    """
+    result = subprocess.run(
+        ["ffprobe", "-v", "error", "-select_streams", "v:0",
+         "-show_entries", "stream=width,height,r_frame_rate:format=duration",
+         "-of", "json", path],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True
+    )
+    data = json.loads(result.stdout)
+    stream = data["streams"][0]
+    num, _, den = stream.get("r_frame_rate", "0/1").partition("/")
+    den = float(den or 1)
+    return {
+        "duration": float(data["format"]["duration"]),
+        "width": int(stream["width"]),
+        "height": int(stream["height"]),
+        "fps": float(num) / den if den else 0.0,
+    }
+
+def probe_duration(path: str) -> float:
+    """
+    Container duration in seconds, read with ffprobe.
+    """
+    result = subprocess.run(
+        ["ffprobe", "-v", "error", "-show_entries", "format=duration",
+         "-of", "default=noprint_wrappers=1:nokey=1", path],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True
+    )
+    return float(result.stdout.strip())
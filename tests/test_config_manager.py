@@ -0,0 +1,65 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+import orjson
+from src.config_manager import ConfigManager, DEFAULT_CONFIG
+
+class TestConfigManager(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "user_config.json")
+        self.cm = ConfigManager(self.path)
+
+    def tearDown(self):
+        ConfigManager._loaded.pop(self.path, None)
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _write(self, data, mtime_ns):
+        with open(self.path, "wb") as f:
+            f.write(orjson.dumps(data))
+        os.utime(self.path, ns=(mtime_ns, mtime_ns))
+
+    def test_missing_file_gives_defaults(self):
+        self.assertEqual(self.cm.load_config(), DEFAULT_CONFIG)
+
+    def test_cache_hit_returns_copy(self):
+        self._write({"folder_weights": {"tech": 50}}, 1_000_000_000)
+        with patch("src.config_manager.orjson.loads", wraps=orjson.loads) as loads:
+            first = self.cm.load_config()
+            first["folder_weights"]["tech"] = 0
+            second = self.cm.load_config()
+        self.assertEqual(loads.call_count, 1)
+        self.assertEqual(second["folder_weights"], {"tech": 50})
+
+    def test_mtime_change_reloads(self):
+        self._write({"batch_count": 2}, 1_000_000_000)
+        self.assertEqual(self.cm.load_config()["batch_count"], 2)
+        self._write({"batch_count": 3}, 2_000_000_000)
+        self.assertEqual(self.cm.load_config()["batch_count"], 3)
+
+    def test_save_is_atomic_and_drops_cache(self):
+        self._write({"batch_count": 2}, 1_000_000_000)
+        self.cm.load_config()
+        with patch("src.config_manager.os.replace", wraps=os.replace) as replace:
+            self.assertTrue(self.cm.save_config({"batch_count": 5}))
+        replace.assert_called_once_with(self.path + ".tmp", self.path)
+        self.assertFalse(os.path.exists(self.path + ".tmp"))
+        self.assertNotIn(self.path, ConfigManager._loaded)
+        self.assertEqual(self.cm.load_config()["batch_count"], 5)
+
+    def test_unchanged_save_skips_write(self):
+        self.assertTrue(self.cm.save_config({"batch_count": 5}))
+        with patch("src.config_manager.os.replace") as replace:
+            self.assertTrue(self.cm.save_config({"batch_count": 5}))
+        replace.assert_not_called()
+
+    def test_save_rewrites_file_edited_elsewhere(self):
+        self.assertTrue(self.cm.save_config({"batch_count": 5}))
+        self._write({"batch_count": 9}, 1_000_000_000)
+        self.assertTrue(self.cm.save_config({"batch_count": 5}))
+        self.assertEqual(self.cm.load_config()["batch_count"], 5)
+
+if __name__ == '__main__':
+    unittest.main()
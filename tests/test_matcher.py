@@ -1,3 +1,5 @@
+import os
+import random
 import unittest
 from unittest.mock import MagicMock, patch
 from src.processors.matcher import Matcher
@@ -18,6 +20,39 @@ class TestMatcher(unittest.TestCase):
         result = self.matcher.weighted_route(weights)
         self.assertTrue(result.endswith("tech"))
 
+    def test_weighted_route_all_zero(self):
+        weights = [
+            FolderWeight(folder="tech", weight=0),
+            FolderWeight(folder="nature", weight=0)
+        ]
+        self.assertIsNone(self.matcher.weighted_route(weights))
+
+    def test_weighted_route_single_folder(self):
+        weights = [FolderWeight(folder="tech", weight=7)]
+        for _ in range(20):
+            self.assertEqual(self.matcher.weighted_route(weights), os.path.join("dummy_assets", "video", "tech"))
+
+    def test_weighted_route_distribution(self):
+        weights = [
+            FolderWeight(folder="tech", weight=75),
+            FolderWeight(folder="nature", weight=25)
+        ]
+        random.seed(1234)
+        picks = [os.path.basename(self.matcher.weighted_route(weights)) for _ in range(4000)]
+        share = picks.count("tech") / len(picks)
+        self.assertAlmostEqual(share, 0.75, delta=0.03)
+
+    def test_route_table_cache(self):
+        weights = [FolderWeight(folder="tech", weight=60), FolderWeight(folder="nature", weight=40)]
+        table = self.matcher._route_table(weights)
+        # Equal weights (even new model instances) reuse the cached table
+        same = [FolderWeight(folder="tech", weight=60), FolderWeight(folder="nature", weight=40)]
+        self.assertIs(self.matcher._route_table(same), table)
+        # New weights replace the entry instead of adding one
+        changed = [FolderWeight(folder="tech", weight=10)]
+        self.assertIsNot(self.matcher._route_table(changed), table)
+        self.assertEqual(self.matcher._route_cache[0], (("tech", 10),))
+
     @patch("src.processors.matcher.get_video_files")
     def test_pick_video(self, mock_get_files):
         mock_get_files.return_value = ["a.mp4", "b.mp4"]
@@ -0,0 +1,50 @@
+import unittest
+from src.pipeline import _filter_escape, _shift_srt, _xfade_filter
+
+class TestShiftSrt(unittest.TestCase):
+    def test_shift_forward(self):
+        text = "1\n00:00:01,500 --> 00:00:02,250\nhello\n\n2\n00:59:59,900 --> 01:00:00,400\nworld\n"
+        shifted, count = _shift_srt(text, 0.2)
+        self.assertEqual(count, 2)
+        self.assertIn("00:00:01,700 --> 00:00:02,450", shifted)
+        self.assertIn("01:00:00,100 --> 01:00:00,600", shifted)
+        self.assertIn("hello", shifted)
+
+    def test_clamped_at_zero(self):
+        shifted, count = _shift_srt("1\n00:00:01,000 --> 00:00:03,000\nhi\n", -2.0)
+        self.assertEqual(count, 1)
+        self.assertIn("00:00:00,000 --> 00:00:01,000", shifted)
+
+    def test_dot_separator(self):
+        # Some tools write "." before the milliseconds; output is always ","
+        shifted, count = _shift_srt("1\n00:00:01.500 --> 00:00:02.250\nhi\n", 0.5)
+        self.assertEqual(count, 1)
+        self.assertIn("00:00:02,000 --> 00:00:02,750", shifted)
+
+class TestFilterEscape(unittest.TestCase):
+    def test_plain_path_unchanged(self):
+        self.assertEqual(_filter_escape("output/run_1/final.srt"), "output/run_1/final.srt")
+
+    def test_windows_drive_letter(self):
+        self.assertEqual(_filter_escape(r"C:\subs\a.srt"), r"C\\:\\\\subs\\\\a.srt")
+
+    def test_quote(self):
+        self.assertEqual(_filter_escape("it's.srt"), r"it\\\'s.srt")
+
+    def test_comma_and_brackets(self):
+        self.assertEqual(_filter_escape("a,b[1];c.srt"), r"a\,b\[1\]\;c.srt")
+
+class TestXfadeFilter(unittest.TestCase):
+    def test_offsets_accumulate(self):
+        graph = _xfade_filter([5.0, 4.0, 6.0], 1.0)
+        self.assertEqual(graph, (
+            "[0:v][1:v]xfade=transition=fade:duration=1.000:offset=4.000[x1];"
+            "[x1][2:v]xfade=transition=fade:duration=1.000:offset=7.000[vx]"
+        ))
+
+    def test_duration_clamped_to_half_shortest_block(self):
+        graph = _xfade_filter([1.0, 3.0], 2.0)
+        self.assertEqual(graph, "[0:v][1:v]xfade=transition=fade:duration=0.500:offset=0.500[vx]")
+
+if __name__ == '__main__':
+    unittest.main()
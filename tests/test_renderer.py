@@ -0,0 +1,74 @@
+import unittest
+from src.processors.renderer import _part_command
+
+def _job(segments, source_meta, speed=1.0, fade_in=0.0, fade_out=0.0):
+    return {
+        "chunk_index": 0,
+        "block_index": 0,
+        "segments": segments,
+        "source_meta": source_meta,
+        "size": (1080, 1920),
+        "fps": 24,
+        "duration": 5.0,
+        "speed": speed,
+        "fade_in": fade_in,
+        "fade_out": fade_out,
+        "threads": 2,
+        "ffmpeg_params": [],
+        "output_path": "part_0.mp4",
+    }
+
+SEGMENT = {"source_file": "a.mp4", "source_start": 1.0, "source_end": 6.0}
+
+def _graph(cmd):
+    return cmd[cmd.index("-filter_complex") + 1]
+
+class TestPartCommand(unittest.TestCase):
+    def test_target_size_skips_scale(self):
+        meta = [{"duration": 10.0, "width": 1080, "height": 1920, "fps": 24.0}]
+        graph = _graph(_part_command(_job([SEGMENT], meta)))
+        self.assertIn("[0:v]setsar=1[s0]", graph)
+        self.assertNotIn("scale=", graph)
+        self.assertNotIn("crop=", graph)
+
+    def test_other_size_scales_and_crops(self):
+        meta = [{"duration": 10.0, "width": 1920, "height": 1080, "fps": 24.0}]
+        graph = _graph(_part_command(_job([SEGMENT], meta)))
+        self.assertIn("scale=1080:1920:force_original_aspect_ratio=increase,crop=1080:1920,setsar=1[s0]", graph)
+
+    def test_native_rate_skips_retiming(self):
+        meta = [{"duration": 10.0, "width": 1080, "height": 1920, "fps": 24.0}]
+        graph = _graph(_part_command(_job([SEGMENT], meta)))
+        self.assertNotIn("setpts=", graph)
+        self.assertNotIn("fps=", graph)
+        self.assertIn("tpad=stop_mode=clone:stop_duration=5.000", graph)
+
+    def test_speed_change_retimes(self):
+        meta = [{"duration": 10.0, "width": 1080, "height": 1920, "fps": 24.0}]
+        graph = _graph(_part_command(_job([SEGMENT], meta, speed=2.0)))
+        self.assertIn("setpts=(PTS-STARTPTS)/2.000000,fps=24", graph)
+
+    def test_other_frame_rate_retimes(self):
+        meta = [
+            {"duration": 10.0, "width": 1080, "height": 1920, "fps": 24.0},
+            {"duration": 10.0, "width": 1080, "height": 1920, "fps": 30.0},
+        ]
+        graph = _graph(_part_command(_job([SEGMENT, SEGMENT], meta)))
+        self.assertIn("[s0][s1]concat=n=2:v=1:a=0,setpts=(PTS-STARTPTS)/1.000000,fps=24", graph)
+
+    def test_seeked_inputs(self):
+        meta = [{"duration": 10.0, "width": 1080, "height": 1920, "fps": 24.0}]
+        cmd = _part_command(_job([SEGMENT], meta))
+        i = cmd.index("-i")
+        self.assertEqual(cmd[i - 4:i + 2], ["-ss", "1.000", "-t", "5.000", "-i", "a.mp4"])
+
+    def test_placeholder_without_sources(self):
+        cmd = _part_command(_job([], [], fade_in=0.5, fade_out=0.5))
+        self.assertIn("color=c=black:s=1080x1920:r=24:d=5.000", cmd)
+        self.assertEqual(
+            _graph(cmd),
+            "[0:v]null,fade=t=in:st=0:d=0.500,fade=t=out:st=4.500:d=0.500[out]"
+        )
+
+if __name__ == '__main__':
+    unittest.main()